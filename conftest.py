@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budget(settings):
+    """Под pytest превышение бюджета запросов view роняет тест,
+    как и в manage.py test (core.test_runner).
+    """
+    settings.QUERY_BUDGET_STRICT = True
@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import QueuedEmail
+
+
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'subject', 'recipients', 'status', 'attempts',
+        'next_attempt_at', 'sent_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('recipients', 'subject')
+    # В теле письма бывают живые ссылки сброса пароля.
+    exclude = ('message',)
+    readonly_fields = ('last_error', 'created', 'sent_at')
+
+
+admin.site.register(QueuedEmail, QueuedEmailAdmin)
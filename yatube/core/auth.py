@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+USER_KEY = 'core:user:{}'
+
+
+def user_cache():
+    """Пользователи кешируются там же, где сессии."""
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def forget_user(user_id):
+    user_cache().delete(USER_KEY.format(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который на каждом запросе берёт пользователя
+    сессии из кеша. Запись сбрасывается при сохранении и удалении
+    пользователя (core.signals) и при выходе.
+    """
+
+    def get_user(self, user_id):
+        key = USER_KEY.format(user_id)
+        user = user_cache().get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            user_cache().set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
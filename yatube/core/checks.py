@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Кеши, которые видит только процесс, записавший в них.
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+# Алиасы, через которые процессы сообщают друг другу об изменениях:
+# поколения лент, страницы, карточки, счётчики, поиск по slug,
+# ключи миниатюр, сессии и пользователи сессий (core.auth).
+SHARED_CACHES = ('default', 'thumbnails', 'sessions')
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    """В бою с несколькими процессами кеш в памяти процесса сбрасывает
+    страницы только там, где прошла запись.
+    """
+    return [
+        Error(
+            f'Кеш {alias!r} хранится в памяти процесса, другие процессы '
+            f'не увидят его инвалидации.',
+            hint='Задайте MEMCACHED_LOCATION или общий бэкенд в CACHES.',
+            id='core.E001',
+        )
+        for alias in SHARED_CACHES
+        if settings.CACHES.get(alias, {}).get('BACKEND')
+        in LOCAL_CACHE_BACKENDS
+    ]
@@ -0,0 +1,22 @@
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение SQLite прагмами
+    из settings.SQLITE_PRAGMAS. База в памяти (тесты) не трогается.
+    """
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+            if name == 'journal_mode':
+                mode = cursor.fetchone()[0]
+                if mode.lower() != str(value).lower():
+                    logger.warning(
+                        'SQLite journal_mode=%s вместо %s', mode, value
+                    )
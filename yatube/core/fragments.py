@@ -0,0 +1,82 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+PLACEHOLDER = '<!--fragment:{}-->'
+FRAGMENT_KEY = 'core:fragment:{}:{}'
+
+
+def header_vary(request):
+    """От чего зависит шапка: пользователь и активный пункт меню."""
+    user = request.user
+    match = request.resolver_match
+    return (
+        user.pk if user.is_authenticated else '',
+        user.get_username() if user.is_authenticated else '',
+        match.view_name if match else '',
+    )
+
+
+# Фрагменты, которые вставляются в страницу после рендера:
+# имя → (шаблон, функция, от результата которой зависит фрагмент).
+FRAGMENTS = {
+    'header': ('includes/header.html', header_vary),
+}
+
+
+def placeholder(name):
+    if name not in FRAGMENTS:
+        raise KeyError(f'Неизвестный фрагмент: {name}')
+    return PLACEHOLDER.format(name)
+
+
+def render_fragment(request, name):
+    """Фрагмент для этого запроса; готовый берётся из кеша."""
+    template, vary = FRAGMENTS[name]
+    key = FRAGMENT_KEY.format(
+        name,
+        hashlib.md5('|'.join(map(str, vary(request))).encode()).hexdigest(),
+    )
+    content = cache.get(key)
+    if content is None:
+        content = render_to_string(template, request=request)
+        cache.set(key, content, settings.FRAGMENT_CACHE_TIMEOUT)
+    return content
+
+
+class FragmentMiddleware:
+    """Заполняет места фрагментов в готовой HTML-странице.
+
+    Тело страницы одинаково для всех посетителей и кешируется
+    целиком, а то, что зависит от пользователя, подставляется здесь.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.placeholders = {
+            name: placeholder(name).encode() for name in FRAGMENTS
+        }
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or not response.get('Content-Type', '').startswith('text/html')
+        ):
+            return response
+        content = response.content
+        changed = False
+        for name, marker in self.placeholders.items():
+            if marker in content:
+                fragment = render_fragment(request, name).encode(
+                    response.charset
+                )
+                content = content.replace(marker, fragment)
+                changed = True
+        if changed:
+            response.content = content
+            if response.has_header('Content-Length'):
+                response['Content-Length'] = str(len(content))
+        return response
@@ -0,0 +1,121 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+
+def delivery_connection(**kwargs):
+    """Соединение бэкенда, который на самом деле доставляет почту."""
+    return get_connection(settings.EMAIL_QUEUE_BACKEND, **kwargs)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Бэкенд для EMAIL_BACKEND: вместо отправки кладёт письма
+    в очередь одним INSERT. Письма с вложениями очередь не хранит,
+    они уходят сразу через EMAIL_QUEUE_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        queued = [
+            QueuedEmail.from_message(message)
+            for message in email_messages if not message.attachments
+        ]
+        direct = [
+            message for message in email_messages if message.attachments
+        ]
+        QueuedEmail.objects.bulk_create(queued)
+        sent = len(queued)
+        if direct:
+            sent += delivery_connection(
+                fail_silently=self.fail_silently
+            ).send_messages(direct) or 0
+        return sent
+
+
+def retry_delay(attempts):
+    """Экспоненциальная пауза перед следующей попыткой."""
+    delay = settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_QUEUE_MAX_DELAY))
+
+
+def claim_batch(batch_size):
+    """Забирает пачку писем, которым пора уйти. Следующая попытка
+    сдвигается на время аренды, чтобы второй обработчик их не взял.
+    """
+    now = timezone.now()
+    due = QueuedEmail.objects.filter(
+        status=QueuedEmail.PENDING, next_attempt_at__lte=now
+    )
+    ids = list(due.values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    lease = now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE)
+    due.filter(id__in=ids).update(next_attempt_at=lease)
+    return list(QueuedEmail.objects.filter(id__in=ids, next_attempt_at=lease))
+
+
+def send_batch(emails):
+    """Отправляет пачку через одно соединение. Возвращает
+    число отправленных и число отложенных писем.
+    """
+    connection = delivery_connection()
+    sent, failed = [], []
+    try:
+        connection.open()
+    except Exception as error:
+        failed = [(email, error) for email in emails]
+    else:
+        try:
+            for email in emails:
+                try:
+                    delivered = connection.send_messages(
+                        [email.to_message(connection)]
+                    )
+                except Exception as error:
+                    failed.append((email, error))
+                else:
+                    if delivered:
+                        sent.append(email.id)
+                    else:
+                        failed.append((email, 'бэкенд не отправил письмо'))
+        finally:
+            connection.close()
+    now = timezone.now()
+    # Тело письма (а в нём и ссылки сброса пароля) больше не нужно.
+    QueuedEmail.objects.filter(id__in=sent).update(
+        status=QueuedEmail.SENT, sent_at=now, last_error='', message=''
+    )
+    for email, error in failed:
+        logger.warning('Письмо %s не отправлено: %s', email.id, error)
+        email.attempts += 1
+        email.last_error = str(error)
+        if email.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+            email.status = QueuedEmail.FAILED
+            email.message = ''
+        else:
+            email.next_attempt_at = now + retry_delay(email.attempts)
+        email.save(update_fields=(
+            'attempts', 'last_error', 'status', 'next_attempt_at', 'message'
+        ))
+    return len(sent), len(failed)
+
+
+def purge_finished(keep_days=None):
+    """Удаляет отправленные и неотправленные письма старше
+    keep_days дней. Возвращает число удалённых.
+    """
+    if keep_days is None:
+        keep_days = settings.EMAIL_QUEUE_KEEP_DAYS
+    deleted, _ = QueuedEmail.objects.exclude(
+        status=QueuedEmail.PENDING
+    ).filter(
+        created__lt=timezone.now() - timedelta(days=keep_days)
+    ).delete()
+    return deleted
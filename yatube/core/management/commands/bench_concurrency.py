@@ -0,0 +1,133 @@
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+from django.test import Client, override_settings
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment
+)
+from django.urls import reverse
+
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Смешанная нагрузка post_create и index из нескольких потоков на '
+        'файловой SQLite: пропускная способность и ошибки блокировок '
+        'без настроек (журнал DELETE, соединение на запрос) и с профилем '
+        'SQLITE_PRAGMAS и CONN_MAX_AGE из settings.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument(
+            '--duration', type=float, default=10,
+            help='Секунд нагрузки на каждый профиль.',
+        )
+        parser.add_argument(
+            '--write-share', type=float, default=0.2,
+            help='Доля запросов на создание поста.',
+        )
+        parser.add_argument('--posts', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        database = connections.databases['default']
+        if database['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('Замер рассчитан на SQLite')
+        if options['threads'] < 1 or options['duration'] <= 0:
+            raise CommandError('Нужны --threads >= 1 и --duration > 0')
+        profiles = (
+            ('без настроек', {}, 0),
+            ('с профилем', settings.SQLITE_PRAGMAS, database['CONN_MAX_AGE']),
+        )
+        self.lock = threading.Lock()
+        test_name = database['TEST']['NAME']
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                for number, (name, pragmas, conn_max_age) in enumerate(
+                    profiles
+                ):
+                    # Каждый профиль — своя свежая файловая база: режим WAL
+                    # сохраняется в файле и повлиял бы на замер без настроек.
+                    database['TEST']['NAME'] = os.path.join(
+                        directory, f'bench{number}.sqlite3'
+                    )
+                    with override_settings(SQLITE_PRAGMAS=pragmas):
+                        result = self.run_profile(options, conn_max_age)
+                    self.report(name, result, options['duration'])
+        finally:
+            database['TEST']['NAME'] = test_name
+
+    def run_profile(self, options, conn_max_age):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        database = connections.databases['default']
+        saved_max_age = database['CONN_MAX_AGE']
+        database['CONN_MAX_AGE'] = conn_max_age
+        try:
+            call_command(
+                'seed_data', users=50, groups=10, posts=options['posts'],
+                workers=1, stdout=StringIO(),
+            )
+            author = User.objects.order_by('id').first()
+            connections.close_all()
+            results = Counter()
+            deadline = time.monotonic() + options['duration']
+            threads = [
+                threading.Thread(
+                    target=self.worker,
+                    args=(author, options['write_share'], deadline, results),
+                )
+                for _ in range(options['threads'])
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return results
+        finally:
+            database['CONN_MAX_AGE'] = saved_max_age
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    def worker(self, author, write_share, deadline, results):
+        client = Client()
+        client.force_login(author)
+        index = reverse('posts:index')
+        create = reverse('posts:post_create')
+        rng = random.Random()
+        local = Counter()
+        try:
+            while time.monotonic() < deadline:
+                kind = 'create' if rng.random() < write_share else 'index'
+                try:
+                    if kind == 'create':
+                        response = client.post(create, {'text': 'Нагрузка'})
+                    else:
+                        response = client.get(index)
+                except DatabaseError:
+                    local['errors'] += 1
+                    continue
+                local[kind if response.status_code < 400 else 'errors'] += 1
+        finally:
+            connections.close_all()
+            with self.lock:
+                results.update(local)
+
+    def report(self, name, result, duration):
+        total = result['create'] + result['index']
+        self.stdout.write(
+            f'{name:<14} {total / duration:>8.1f} запр/с  '
+            f'создание: {result["create"]:>6}  главная: {result["index"]:>6}'
+            f'  ошибки: {result["errors"]:>4}'
+        )
@@ -0,0 +1,249 @@
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from importlib import import_module
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment
+)
+from django.urls import URLPattern, reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from core.query_budget import QueryCounter
+from posts.models import Group, Post, PostCounter
+
+URL_MODULES = ('posts.urls', 'users.urls', 'about.urls')
+ROLES = ('guest', 'author')
+# Метрики, которые сравниваются с эталоном по относительному допуску.
+# Число запросов сравнивается точно: лишний запрос — всегда регрессия.
+TOLERATED_METRICS = ('p50_ms', 'p95_ms', 'bytes', 'peak_kb')
+# Разница во времени меньше этой считается шумом.
+MIN_DELTA_MS = 1.0
+
+
+def url_names():
+    for module_name in URL_MODULES:
+        module = import_module(module_name)
+        for pattern in module.urlpatterns:
+            if isinstance(pattern, URLPattern) and pattern.name:
+                yield (
+                    f'{module.app_name}:{pattern.name}',
+                    list(pattern.pattern.converters),
+                )
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def read_content(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет view из posts, users и about на тестовой базе, '
+        'заполненной seed_data: p50/p95, число запросов, размер ответа '
+        'и пик памяти. Сравнивает с эталоном и падает при регрессии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Замеров на каждый адрес и роль.',
+        )
+        parser.add_argument(
+            '--baseline', default='benchmarks/views.json',
+            help='JSON-файл эталона.',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Допустимый относительный рост метрик (0.25 — 25%%).',
+        )
+        parser.add_argument(
+            '--update-baseline', action='store_true',
+            help='Записать результаты как новый эталон.',
+        )
+        parser.add_argument(
+            '--current-database', action='store_true',
+            help='Мерить на текущей базе, без тестовой базы и seed_data.',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat должен быть больше нуля')
+        if options['current_database']:
+            results = self.run(options)
+        else:
+            setup_test_environment()
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                call_command(
+                    'seed_data', users=options['users'],
+                    groups=options['groups'], posts=options['posts'],
+                    stdout=self.stderr,
+                )
+                results = self.run(options)
+            finally:
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+        self.report(results)
+        self.check_baseline(results, options)
+
+    def run(self, options):
+        samples = self.samples()
+        results = {}
+        with self.staff_author():
+            for name, params in url_names():
+                missing = set(params) - samples.keys()
+                if missing:
+                    self.stderr.write(
+                        f'{name}: нет значений для '
+                        f'{", ".join(sorted(missing))}'
+                    )
+                    continue
+                address = reverse(
+                    name, kwargs={param: samples[param] for param in params}
+                )
+                for role in ROLES:
+                    results[f'{name} {role}'] = self.measure(
+                        address, role, options['repeat']
+                    )
+        return results
+
+    @contextmanager
+    def staff_author(self):
+        """Автор на время замеров получает is_staff, чтобы измерить
+        полную выгрузку; с --current-database это настоящая база,
+        поэтому флаг возвращается и после ошибки.
+        """
+        if self.author.is_staff:
+            yield
+            return
+        self.author.is_staff = True
+        self.author.save(update_fields=['is_staff'])
+        try:
+            yield
+        finally:
+            self.author.is_staff = False
+            self.author.save(update_fields=['is_staff'])
+
+    def samples(self):
+        """Значения параметров адресов: самые тяжёлые автор и группа."""
+        counter = PostCounter.objects.select_related('author').order_by(
+            '-posts_count'
+        ).first()
+        group = Group.objects.order_by('-id').first()
+        if counter is None or group is None:
+            raise CommandError('В базе нет постов или групп для замеров')
+        self.author = counter.author
+        return {
+            'username': self.author.username,
+            'slug': group.slug,
+            'post_id': Post.objects.filter(author=self.author).latest(
+                'pub_date'
+            ).id,
+            'file_format': 'csv',
+            'uidb64': urlsafe_base64_encode(force_bytes(self.author.pk)),
+            'token': default_token_generator.make_token(self.author),
+        }
+
+    def request(self, address, role):
+        client = Client()
+        if role == 'author':
+            client.force_login(self.author)
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = client.get(address)
+            content = read_content(response)
+        elapsed = time.perf_counter() - started
+        return elapsed, counter.count, response.status_code, content
+
+    def measure(self, address, role, repeat):
+        # Первый запрос прогревает кеши и шаблоны и в замер не идёт.
+        self.request(address, role)
+        timings, queries = [], []
+        for _ in range(repeat):
+            elapsed, count, status, content = self.request(address, role)
+            timings.append(elapsed * 1000)
+            queries.append(count)
+        tracemalloc.start()
+        try:
+            self.request(address, role)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            'status': status,
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'queries': max(queries),
+            'bytes': len(content),
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"адрес":<40} {"код":>4} {"p50, мс":>9} {"p95, мс":>9} '
+            f'{"SQL":>5} {"байт":>9} {"пик, КБ":>9}'
+        )
+        for key, row in results.items():
+            self.stdout.write(
+                f'{key:<40} {row["status"]:>4} {row["p50_ms"]:>9.2f} '
+                f'{row["p95_ms"]:>9.2f} {row["queries"]:>5} '
+                f'{row["bytes"]:>9} {row["peak_kb"]:>9.1f}'
+            )
+
+    def check_baseline(self, results, options):
+        path = options['baseline']
+        if options['update_baseline'] or not os.path.exists(path):
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as baseline:
+                json.dump(results, baseline, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f'Эталон записан в {path}'))
+            return
+        with open(path, encoding='utf-8') as baseline:
+            expected = json.load(baseline)
+        regressions = []
+        for key, row in results.items():
+            if key not in expected:
+                continue
+            was = expected[key]
+            if row['status'] != was['status']:
+                regressions.append(
+                    f'{key}: код ответа {was["status"]} → {row["status"]}'
+                )
+            if row['queries'] > was['queries']:
+                regressions.append(
+                    f'{key}: SQL {was["queries"]} → {row["queries"]}'
+                )
+            for metric in TOLERATED_METRICS:
+                limit = was[metric] * (1 + options['tolerance'])
+                if metric.endswith('_ms'):
+                    limit = max(limit, was[metric] + MIN_DELTA_MS)
+                if row[metric] > limit:
+                    regressions.append(
+                        f'{key}: {metric} {was[metric]} → {row[metric]}'
+                    )
+        if regressions:
+            raise CommandError(
+                'Регрессия относительно эталона:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
@@ -0,0 +1,65 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.mail import claim_batch, purge_finished, send_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди QueuedEmail пачками, по одному '
+        'соединению EMAIL_QUEUE_BACKEND на пачку; неудачные попытки '
+        'повторяются с экспоненциальной паузой. Законченные письма '
+        'старше --keep-days удаляются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_QUEUE_BATCH_SIZE,
+            help='Писем на одно соединение.',
+        )
+        parser.add_argument(
+            '--keep-days', type=int,
+            default=settings.EMAIL_QUEUE_KEEP_DAYS,
+            help='Сколько дней хранить отправленные и неотправленные '
+                 'письма.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать новые письма.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Секунд между проверками очереди в режиме --loop.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        if options['keep_days'] < 0:
+            raise CommandError('--keep-days не может быть отрицательным')
+        while True:
+            sent, failed = self.drain(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено: {sent}, отложено или не отправлено: '
+                    f'{failed}'
+                )
+            purged = purge_finished(options['keep_days'])
+            if purged:
+                self.stdout.write(f'Удалено старых писем: {purged}')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def drain(self, batch_size):
+        total_sent = total_failed = 0
+        while True:
+            emails = claim_batch(batch_size)
+            if not emails:
+                return total_sent, total_failed
+            sent, failed = send_batch(emails)
+            total_sent += sent
+            total_failed += failed
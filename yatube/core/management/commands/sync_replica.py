@@ -0,0 +1,68 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную SQLite-базу в файлы реплик через online '
+        'backup API. С --interval повторяет копирование в цикле.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'replicas', nargs='*',
+            help='Алиасы реплик; по умолчанию settings.DATABASE_REPLICAS.',
+        )
+        parser.add_argument(
+            '--path',
+            help='Копировать в этот файл вместо файла реплики.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять каждые N секунд; 0 — скопировать один раз.',
+        )
+        parser.add_argument(
+            '--pages', type=int, default=1024,
+            help='Страниц за шаг копирования: между шагами основная база '
+                 'доступна для записи.',
+        )
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Синхронизация реплик рассчитана на SQLite')
+        if options['path']:
+            targets = [options['path']]
+        else:
+            replicas = options['replicas'] or settings.DATABASE_REPLICAS
+            if not replicas:
+                raise CommandError('Реплики не настроены (DATABASE_REPLICAS)')
+            targets = []
+            for alias in replicas:
+                if alias not in connections.databases:
+                    raise CommandError(f'Нет базы {alias} в DATABASES')
+                targets.append(connections.databases[alias]['NAME'])
+        while True:
+            for target in targets:
+                self.copy(source, target, options['pages'])
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def copy(self, source, target, pages):
+        started = time.monotonic()
+        source.ensure_connection()
+        # Копирование идёт поверх файла, а не через замену: открытые
+        # соединения реплики сразу видят новые данные.
+        replica = sqlite3.connect(target)
+        try:
+            source.connection.backup(replica, pages=pages)
+        finally:
+            replica.close()
+        self.stdout.write(
+            f'{target}: {(time.monotonic() - started) * 1000:.0f} мс'
+        )
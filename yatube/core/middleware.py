@@ -0,0 +1,90 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('core.timing')
+slow_logger = logging.getLogger('core.timing.slow')
+
+
+class RequestTimings:
+    def __init__(self):
+        self.sql_ms = 0.0
+        self.queries = 0
+        self.template_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+
+
+def record_template_time(request, elapsed_ms):
+    timings = getattr(request, 'timings', None)
+    if timings is not None:
+        timings.template_ms += elapsed_ms
+
+
+def shows_server_timing(request):
+    """Server-Timing раскрывает число и время SQL-запросов, поэтому
+    вне SERVER_TIMING_HEADER его видит только персонал.
+    """
+    if settings.SERVER_TIMING_HEADER:
+        return True
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_staff
+
+
+class RequestTimingMiddleware:
+    """Время SQL, шаблонов и всего запроса: заголовок Server-Timing,
+    строка в лог core.timing и выборка медленных запросов
+    в core.timing.slow. Тело StreamingHttpResponse отдаётся после
+    замера и в него не входит.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.timings = timings = RequestTimings()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        app_ms = max(total_ms - timings.sql_ms - timings.template_ms, 0)
+        if shows_server_timing(request):
+            response['Server-Timing'] = ', '.join((
+                f'sql;dur={timings.sql_ms:.1f};'
+                f'desc="{timings.queries} queries"',
+                f'tpl;dur={timings.template_ms:.1f}',
+                f'app;dur={app_ms:.1f}',
+                f'total;dur={total_ms:.1f}',
+            ))
+        match = request.resolver_match
+        record = {
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'sql_ms': round(timings.sql_ms, 1),
+            'queries': timings.queries,
+            'template_ms': round(timings.template_ms, 1),
+            'app_ms': round(app_ms, 1),
+        }
+        logger.info(json.dumps(record))
+        if (
+            total_ms >= settings.SLOW_REQUEST_MS
+            and random.random() < settings.SLOW_REQUEST_SAMPLE_RATE
+        ):
+            slow_logger.warning(json.dumps(record))
+        return response
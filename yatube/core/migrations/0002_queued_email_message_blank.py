@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='queuedemail',
+            name='message',
+            field=models.TextField(blank=True, help_text='Поля EmailMessage в JSON; стирается, когда письмо отправлено или попытки кончились', verbose_name='Письмо'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+import json
+
+from django.core.mail import EmailMultiAlternatives
+from django.db import models
+from django.utils import timezone
+
+
+class QueuedEmail(models.Model):
+    """Письмо в очереди: уходит командой send_queued_mail,
+    а не в том запросе, где его отправили.
+    """
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    subject = models.CharField('Тема', max_length=255)
+    recipients = models.TextField('Получатели')
+    message = models.TextField(
+        'Письмо',
+        blank=True,
+        help_text='Поля EmailMessage в JSON; стирается, когда письмо '
+                  'отправлено или попытки кончились'
+    )
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', blank=True, null=True)
+
+    class Meta:
+        ordering = ('id',)
+        indexes = (
+            models.Index(
+                fields=('status', 'next_attempt_at'),
+                name='queued_email_due_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.subject} → {self.recipients}'
+
+    @classmethod
+    def from_message(cls, message):
+        return cls(
+            subject=message.subject[:255],
+            recipients=', '.join(message.recipients()),
+            message=json.dumps({
+                'subject': message.subject,
+                'body': message.body,
+                'from_email': message.from_email,
+                'to': message.to,
+                'cc': message.cc,
+                'bcc': message.bcc,
+                'reply_to': message.reply_to,
+                'headers': message.extra_headers,
+                'alternatives': getattr(message, 'alternatives', []),
+            }, ensure_ascii=False),
+        )
+
+    def to_message(self, connection=None):
+        fields = json.loads(self.message)
+        alternatives = fields.pop('alternatives')
+        return EmailMultiAlternatives(
+            connection=connection,
+            alternatives=[tuple(item) for item in alternatives],
+            **fields
+        )
@@ -0,0 +1,70 @@
+import functools
+import logging
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Запросы внутри outside_budget() не входят в бюджет view.
+budget_paused = ContextVar('budget_paused', default=False)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if not budget_paused.get():
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def outside_budget():
+    """Для фоновой работы, которая лишь случайно выполняется внутри
+    запроса, например миниатюры при POSTS_THUMBNAIL_WORKERS = 0.
+    """
+    token = budget_paused.set(True)
+    try:
+        yield
+    finally:
+        budget_paused.reset(token)
+
+
+def query_budget(limit):
+    """Ограничивает число SQL-запросов, которое может сделать view.
+
+    Превышение пишется в лог, а при QUERY_BUDGET_STRICT = True
+    приводит к исключению QueryBudgetExceeded.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            counter = QueryCounter()
+            # Считаются запросы ко всем базам, в том числе к реплике.
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(counter)
+                    )
+                response = view(request, *args, **kwargs)
+            if counter.count > limit:
+                message = (
+                    f'{view.__module__}.{view.__name__}: '
+                    f'{counter.count} SQL-запросов при бюджете {limit} '
+                    f'({request.get_full_path()})'
+                )
+                if settings.QUERY_BUDGET_STRICT:
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
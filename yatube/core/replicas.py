@@ -0,0 +1,96 @@
+import functools
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Алиас реплики, с которой читает текущий view, или None.
+current_replica = ContextVar('current_replica', default=None)
+
+
+class ReplicaRouter:
+    """Чтение внутри read_replica уходит на одну из реплик
+    settings.DATABASE_REPLICAS, всё остальное — на основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        return current_replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему вместе с данными через sync_replica.
+        return db not in settings.DATABASE_REPLICAS
+
+
+@contextmanager
+def replica_reads():
+    token = current_replica.set(random.choice(settings.DATABASE_REPLICAS))
+    try:
+        yield
+    finally:
+        current_replica.reset(token)
+
+
+def is_sticky(request):
+    """Автор только что писал: ему показываем основную базу,
+    пока реплика не догнала (read-your-writes).
+    """
+    return settings.REPLICA_STICKY_COOKIE in request.COOKIES
+
+
+def uses_replica(request):
+    return bool(settings.DATABASE_REPLICAS) and not is_sticky(request)
+
+
+def replica_lag_bucket(request):
+    """Для ответов с реплики — номер интервала REPLICA_MAX_LAG,
+    чтобы ETag устаревшей страницы сменился не позже, чем через лаг.
+    """
+    if not uses_replica(request):
+        return None
+    return int(time.time() // settings.REPLICA_MAX_LAG)
+
+
+def read_replica(view):
+    """Запросы чтения view идут на реплику, если она настроена и
+    посетитель не писал в последние REPLICA_MAX_LAG секунд.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.replica = uses_replica(request)
+        if not request.replica:
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaStickinessMiddleware:
+    """После успешного изменяющего запроса ставит cookie, которая
+    на REPLICA_MAX_LAG секунд закрепляет чтение за основной базой.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_MAX_LAG, httponly=True,
+                samesite='Lax',
+            )
+        return response
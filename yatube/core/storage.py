@@ -0,0 +1,64 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.map', '.svg', '.json', '.txt', '.ico')
+
+
+def gzip_compress(data):
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_compress(data):
+    return brotli.compress(data, quality=11)
+
+
+# Суффикс файла и сжатие, в порядке предпочтения при отдаче.
+COMPRESSORS = [('.gz', 'gzip', gzip_compress)]
+if brotli is not None:
+    COMPRESSORS.insert(0, ('.br', 'br', brotli_compress))
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем содержимого в имени и сжатыми копиями (.br, .gz)
+    рядом с каждым таким файлом, которые пишет collectstatic.
+
+    Пока collectstatic не запускали и манифеста нет (разработка,
+    тесты), адреса остаются без хеша.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE):
+                self.compress(name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+        for suffix, _, compress in COMPRESSORS:
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                continue
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+
+    def is_hashed(self, name):
+        # Множество имён строится один раз: манифест меняет только
+        # collectstatic, после него процесс перезапускается.
+        if getattr(self, '_hashed_names', None) is None:
+            self._hashed_names = set(self.hashed_files.values())
+        return name in self._hashed_names
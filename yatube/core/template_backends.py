@@ -0,0 +1,32 @@
+import time
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from .middleware import record_template_time
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            record_template_time(
+                request, (time.perf_counter() - started) * 1000
+            )
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Шаблонизатор Django, который прибавляет время отрисовки
+    к замерам запроса (core.middleware.RequestTimingMiddleware).
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(
+            super().from_string(template_code).template, self
+        )
+
+    def get_template(self, template_name):
+        return TimedTemplate(
+            super().get_template(template_name).template, self
+        )
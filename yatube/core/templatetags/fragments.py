@@ -0,0 +1,12 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..fragments import placeholder
+
+register = template.Library()
+
+
+@register.simple_tag
+def fragment(name):
+    """Место фрагмента, который заполнит FragmentMiddleware."""
+    return mark_safe(placeholder(name))
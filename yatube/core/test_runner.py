@@ -0,0 +1,17 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class StrictQueryBudgetRunner(DiscoverRunner):
+    """manage.py test с QUERY_BUDGET_STRICT = True: превышение бюджета
+    запросов view роняет тест, а не пишется в лог.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.strict_budget = override_settings(QUERY_BUDGET_STRICT=True)
+        self.strict_budget.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.strict_budget.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import Client, TestCase
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class CachedSessionUserTests(TestCase):
+    def setUp(self):
+        caches['sessions'].clear()
+        self.user = User.objects.create_user(
+            username='auth', password='old-password-42'
+        )
+        self.client = Client()
+        self.client.login(username='auth', password='old-password-42')
+        # Первый запрос кладёт пользователя в кеш.
+        self.client.get(reverse('about:author'))
+
+    def test_authenticated_page_needs_no_auth_queries(self):
+        """Сессия и пользователь читаются из кеша"""
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('about:author'))
+        self.assertContains(response, 'Пользователь: auth')
+
+    def test_admin_edit_refreshes_cached_user(self):
+        """Сохранение пользователя сбрасывает кеш"""
+        self.user.username = 'renamed'
+        self.user.save()
+        response = self.client.get(reverse('about:author'))
+        self.assertContains(response, 'Пользователь: renamed')
+
+    def test_password_change_and_logout_invalidate_user(self):
+        """Смена пароля сохраняет сессию, а старые сессии и выход
+        из аккаунта перестают пускать
+        """
+        other = Client()
+        other.login(username='auth', password='old-password-42')
+        other.get(reverse('about:author'))
+        self.client.post(reverse('users:password_change'), {
+            'old_password': 'old-password-42',
+            'new_password1': 'new-password-42',
+            'new_password2': 'new-password-42',
+        })
+        response = self.client.get(reverse('about:author'))
+        self.assertContains(response, 'Пользователь: auth')
+        response = other.get(reverse('about:author'))
+        self.assertNotContains(response, 'Пользователь: auth')
+        self.client.get(reverse('users:logout'))
+        response = self.client.get(reverse('about:author'))
+        self.assertNotContains(response, 'Пользователь: auth')
+
+    def test_sessions_of_plain_model_backend_still_work(self):
+        """Сессии, открытые через ModelBackend, продолжают пускать"""
+        client = Client()
+        client.force_login(
+            self.user, backend='django.contrib.auth.backends.ModelBackend'
+        )
+        response = client.get(reverse('about:author'))
+        self.assertContains(response, 'Пользователь: auth')
@@ -0,0 +1,24 @@
+from django.test import SimpleTestCase, override_settings
+
+from ..checks import check_shared_caches
+
+SHARED = {'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache'}
+LOCAL = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+
+
+class SharedCachesCheckTests(SimpleTestCase):
+    @override_settings(CACHES={
+        'default': LOCAL, 'thumbnails': SHARED, 'sessions': SHARED,
+    })
+    def test_local_cache_is_an_error(self):
+        """Кеш в памяти процесса не проходит проверку --deploy"""
+        errors = check_shared_caches(None)
+        self.assertEqual([error.id for error in errors], ['core.E001'])
+        self.assertIn("'default'", errors[0].msg)
+
+    @override_settings(CACHES={
+        'default': SHARED, 'thumbnails': SHARED, 'sessions': SHARED,
+    })
+    def test_shared_caches_pass(self):
+        """Общий кеш проверку проходит"""
+        self.assertEqual(check_shared_caches(None), [])
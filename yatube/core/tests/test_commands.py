@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+User = get_user_model()
+
+
+class BenchmarkViewsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command(
+            'seed_data', users=3, groups=2, posts=30, workers=1,
+            stdout=StringIO()
+        )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.baseline = os.path.join(self.directory.name, 'views.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def benchmark(self, **options):
+        call_command(
+            'benchmark_views', current_database=True, repeat=2,
+            baseline=self.baseline, stdout=StringIO(), stderr=StringIO(),
+            **options
+        )
+
+    def test_baseline_covers_all_apps(self):
+        """Эталон содержит метрики адресов posts, users и about"""
+        self.benchmark()
+        with open(self.baseline) as baseline:
+            results = json.load(baseline)
+        for key in ('posts:index guest', 'posts:post_edit author',
+                    'users:login guest', 'about:tech author'):
+            with self.subTest(key=key):
+                self.assertEqual(
+                    set(results[key]),
+                    {'status', 'p50_ms', 'p95_ms', 'queries', 'bytes',
+                     'peak_kb'}
+                )
+        self.assertEqual(results['posts:index guest']['status'], 200)
+
+    def test_author_is_not_left_staff(self):
+        """После замеров на текущей базе никто не остаётся персоналом"""
+        self.benchmark()
+        self.assertFalse(User.objects.filter(is_staff=True).exists())
+
+    def test_regression_fails(self):
+        """Рост числа запросов относительно эталона — ошибка"""
+        self.benchmark()
+        with open(self.baseline) as baseline:
+            results = json.load(baseline)
+        results['posts:index author']['queries'] -= 1
+        with open(self.baseline, 'w') as baseline:
+            json.dump(results, baseline)
+        with self.assertRaisesMessage(CommandError, 'posts:index author'):
+            self.benchmark(tolerance=10)
@@ -0,0 +1,43 @@
+import os
+import tempfile
+
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import TestCase, override_settings
+
+
+class SqlitePragmasTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.connection = DatabaseWrapper(
+            {
+                **connections.databases['default'],
+                'NAME': os.path.join(self.directory.name, 'pragmas.sqlite3'),
+            },
+            'pragmas',
+        )
+
+    def tearDown(self):
+        self.connection.close()
+        self.directory.cleanup()
+
+    def pragma(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={
+        'journal_mode': 'WAL', 'synchronous': 'NORMAL',
+        'busy_timeout': 1234, 'cache_size': -2000,
+    })
+    def test_new_connection_gets_pragmas(self):
+        """Новое соединение SQLite получает прагмы из настроек"""
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 1234)
+        self.assertEqual(self.pragma('cache_size'), -2000)
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_pragmas_are_optional(self):
+        """Без прагм в настройках соединение остаётся по умолчанию"""
+        self.assertEqual(self.pragma('journal_mode'), 'delete')
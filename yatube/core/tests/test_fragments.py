@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..fragments import placeholder
+
+
+class FragmentMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_header_is_stitched_from_cache(self):
+        """Шапка подставляется вместо метки и второй раз берётся
+        из кеша
+        """
+        address = reverse('about:author')
+        self.guest_client.get(address)
+        response = self.guest_client.get(address)
+        self.assertTemplateNotUsed(response, 'includes/header.html')
+        self.assertNotContains(response, placeholder('header'))
+        self.assertContains(response, 'Войти')
+        self.assertEqual(
+            int(response['Content-Length']), len(response.content)
+        )
+
+    def test_header_depends_on_current_view(self):
+        """Активный пункт меню у каждой страницы свой"""
+        tech_url = reverse('about:tech')
+        active_tech = r'nav-link active"\s+href="{}"'.format(tech_url)
+        self.assertNotRegex(
+            self.guest_client.get(reverse('about:author')).content.decode(),
+            active_tech
+        )
+        self.assertRegex(
+            self.guest_client.get(tech_url).content.decode(), active_tech
+        )
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import QueuedEmail
+
+User = get_user_model()
+
+
+class CountingBackend(EmailBackend):
+    """locmem-бэкенд, который считает открытые соединения."""
+
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise SMTPException('сервер недоступен')
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    EMAIL_QUEUE_BACKEND='core.tests.test_mail.CountingBackend',
+    EMAIL_QUEUE_MAX_ATTEMPTS=2,
+)
+class QueuedEmailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', email='auth@yatube.ru', password='pass'
+        )
+
+    def send(self, **options):
+        call_command('send_queued_mail', stdout=StringIO(), **options)
+
+    def test_password_reset_only_enqueues(self):
+        """Сброс пароля кладёт письмо в очередь, а отправляет его
+        команда
+        """
+        response = Client().post(
+            reverse('users:password_reset_form'), {'email': 'auth@yatube.ru'}
+        )
+        self.assertRedirects(response, reverse('users:password_reset_done'))
+        self.assertEqual(len(mail.outbox), 0)
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.recipients, 'auth@yatube.ru')
+        self.send()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('/auth/reset/', mail.outbox[0].body)
+        email.refresh_from_db()
+        self.assertEqual(email.status, QueuedEmail.SENT)
+        self.assertEqual(email.message, '')
+
+    def test_finished_emails_are_purged(self):
+        """Команда удаляет законченные письма старше --keep-days"""
+        mail.send_mass_mail([
+            (f'Письмо {n}', 'Текст', None, ['auth@yatube.ru'])
+            for n in range(2)
+        ])
+        self.send()
+        old, recent = QueuedEmail.objects.all()
+        QueuedEmail.objects.filter(pk=old.pk).update(
+            created=timezone.now() - timedelta(days=8)
+        )
+        mail.send_mail('В очереди', 'Текст', None, ['auth@yatube.ru'])
+        QueuedEmail.objects.filter(subject='В очереди').update(
+            created=timezone.now() - timedelta(days=8),
+            next_attempt_at=timezone.now() + timedelta(days=1),
+        )
+        self.send(keep_days=7)
+        self.assertEqual(
+            list(QueuedEmail.objects.values_list('subject', flat=True)),
+            [recent.subject, 'В очереди']
+        )
+
+    def test_batch_reuses_one_connection(self):
+        """Пачка писем уходит через одно соединение"""
+        mail.send_mass_mail([
+            (f'Письмо {n}', 'Текст', None, ['auth@yatube.ru'])
+            for n in range(5)
+        ])
+        CountingBackend.opened = 0
+        self.send(batch_size=3)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingBackend.opened, 2)
+        self.assertFalse(
+            QueuedEmail.objects.exclude(status=QueuedEmail.SENT).exists()
+        )
+
+    @override_settings(
+        EMAIL_QUEUE_BACKEND='core.tests.test_mail.FailingBackend'
+    )
+    def test_failed_email_is_retried_with_backoff(self):
+        """Неудачное письмо откладывается, а после всех попыток
+        помечается как неотправленное
+        """
+        mail.send_mail('Тема', 'Текст', None, ['auth@yatube.ru'])
+        with self.assertLogs('core.mail', 'WARNING'):
+            self.send()
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.status, QueuedEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('сервер недоступен', email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.send()
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 1)
+        QueuedEmail.objects.update(next_attempt_at=timezone.now())
+        with self.assertLogs('core.mail', 'WARNING'):
+            self.send()
+        email.refresh_from_db()
+        self.assertEqual(email.status, QueuedEmail.FAILED)
+        self.assertEqual(email.attempts, 2)
+        self.assertEqual(email.message, '')
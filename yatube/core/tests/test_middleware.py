@@ -0,0 +1,76 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class RequestTimingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_server_timing_header(self):
+        """Персонал получает Server-Timing с SQL, шаблонами
+        и общим временем
+        """
+        staff_client = Client()
+        staff_client.force_login(self.staff)
+        response = staff_client.get(reverse('posts:index'))
+        metrics = dict(
+            part.strip().split(';', 1)
+            for part in response['Server-Timing'].split(',')
+        )
+        self.assertEqual(set(metrics), {'sql', 'tpl', 'app', 'total'})
+        self.assertIn('queries', metrics['sql'])
+        self.assertNotEqual(metrics['tpl'], 'dur=0.0')
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_server_timing_is_hidden_from_visitors(self):
+        """Без SERVER_TIMING_HEADER гость и обычный пользователь
+        Server-Timing не получают
+        """
+        for client in (Client(), self.authorized_client):
+            with self.subTest(client=client):
+                response = client.get(reverse('posts:index'))
+                self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_request_is_logged_with_view_name(self):
+        """Каждый запрос пишется в лог строкой JSON с именем view"""
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            self.authorized_client.get(
+                reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+            )
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'posts:post_detail')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+
+    def test_slow_requests_are_sampled(self):
+        """Медленные запросы попадают в отдельный лог с учётом выборки"""
+        address = reverse('posts:index')
+        with override_settings(SLOW_REQUEST_MS=0):
+            with self.assertLogs('core.timing.slow', 'WARNING') as logs:
+                self.authorized_client.get(address)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'posts:index')
+        with override_settings(SLOW_REQUEST_MS=0, SLOW_REQUEST_SAMPLE_RATE=0):
+            with self.assertLogs('core.timing', 'INFO') as logs:
+                self.authorized_client.get(address)
+        self.assertEqual(
+            [record.name for record in logs.records], ['core.timing']
+        )
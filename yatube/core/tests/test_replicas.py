@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, router
+from django.test import Client, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.replicas import replica_reads
+from posts.lookups import group_by_slug
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.post = Post.objects.create(author=self.user, text='Тестовый пост')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def replica_queries(self, address, **kwargs):
+        with CaptureQueriesContext(connections['replica']) as queries:
+            response = self.client.get(address, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_router_sends_only_reads_to_replica(self):
+        """Внутри replica_reads чтение идёт на реплику, запись — нет"""
+        self.assertEqual(router.db_for_read(Post), 'default')
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Post), 'replica')
+            self.assertEqual(router.db_for_write(Post), 'default')
+
+    def test_feed_reads_from_replica_until_author_writes(self):
+        """Ленты читаются с реплики, автор после записи — с основной"""
+        addresses = (
+            reverse('posts:index'),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+        )
+        for address in addresses:
+            with self.subTest(address=address):
+                self.assertGreater(self.replica_queries(address), 0)
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'}
+        )
+        self.assertIn(settings.REPLICA_STICKY_COOKIE, response.cookies)
+        for address in addresses:
+            with self.subTest(address=address):
+                self.assertEqual(self.replica_queries(address), 0)
+
+    def test_post_not_modified_reads_replica(self):
+        """ETag страницы поста проверяется по реплике"""
+        address = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.id}
+        )
+        etag = self.client.get(address)['ETag']
+        with CaptureQueriesContext(connections['replica']) as queries:
+            response = self.client.get(address, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertTrue([
+            query for query in queries.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+        ])
+
+    @override_settings(LOOKUP_MISS_TIMEOUT=60, REPLICA_MAX_LAG=5)
+    def test_replica_misses_live_no_longer_than_lag(self):
+        """Отсутствие группы на реплике кешируется не дольше лага"""
+        group_by_slug.local.clear()
+        with mock.patch('posts.lookups.cache', wraps=cache) as shared:
+            with replica_reads():
+                self.assertIsNone(group_by_slug.get('new-group'))
+        shared.set.assert_called_once_with(
+            group_by_slug.key('new-group'), (), 5
+        )
+        expires = group_by_slug.local['new-group'][1]
+        self.assertLessEqual(expires - time.monotonic(), 5)
+
+    def test_sync_replica_copies_database(self):
+        """sync_replica копирует основную базу в файл реплики"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'replica.sqlite3')
+            call_command('sync_replica', path=path, stdout=StringIO())
+            replica = sqlite3.connect(path)
+            try:
+                rows = replica.execute(
+                    'SELECT text FROM posts_post'
+                ).fetchall()
+            finally:
+                replica.close()
+        self.assertEqual(rows, [('Тестовый пост',)])
@@ -0,0 +1,65 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import TestCase, Client, override_settings
+
+from core.storage import COMPRESSORS
+
+STYLE = 'body { color: black; }\n' * 200
+
+
+class StaticPipelineTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        source = os.path.join(self.directory.name, 'source')
+        os.makedirs(os.path.join(source, 'css'))
+        with open(os.path.join(source, 'css', 'site.css'), 'w') as style:
+            style.write(STYLE)
+        self.settings_override = override_settings(
+            STATICFILES_DIRS=[source],
+            STATIC_ROOT=os.path.join(self.directory.name, 'root'),
+            INSTALLED_APPS=['django.contrib.staticfiles'],
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.directory.cleanup()
+
+    def collect(self):
+        call_command('collectstatic', interactive=False, stdout=StringIO())
+        return static('css/site.css')
+
+    def test_urls_without_manifest_are_plain(self):
+        """Без collectstatic адреса статики остаются без хеша"""
+        self.assertEqual(static('css/site.css'), '/static/css/site.css')
+
+    def test_collectstatic_writes_hashed_compressed_files(self):
+        """collectstatic пишет файлы с хешем и сжатые копии"""
+        url = self.collect()
+        self.assertRegex(url, r'^/static/css/site\.[0-9a-f]{12}\.css$')
+        path = staticfiles_storage.path(url[len('/static/'):])
+        for suffix, _, _ in COMPRESSORS:
+            with self.subTest(suffix=suffix):
+                self.assertLess(
+                    os.path.getsize(path + suffix), os.path.getsize(path)
+                )
+
+    def test_hashed_files_are_served_immutable_and_compressed(self):
+        """Файл с хешем отдаётся сжатым и с вечным кешем"""
+        url = self.collect()
+        suffix, encoding, _ = COMPRESSORS[0]
+        response = Client().get(url, HTTP_ACCEPT_ENCODING=f'{encoding}')
+        self.assertEqual(response['Content-Encoding'], encoding)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Type'], 'text/css')
+        response = Client().get(url)
+        self.assertEqual(
+            b''.join(response.streaming_content).decode(), STYLE
+        )
+        response = Client().get('/static/css/site.css')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
@@ -0,0 +1,51 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .storage import COMPRESSORS
+
+# Имя с хешем меняется вместе с содержимым: такой файл можно кешировать
+# навсегда и не перепроверять.
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def serve_static(request, path):
+    """Отдаёт файл из STATIC_ROOT: готовую сжатую копию, если клиент её
+    принимает, и вечный кеш для имён с хешем.
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    stat = os.stat(full_path)
+    hashed = staticfiles_storage.is_hashed(path)
+    if not hashed and not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime, stat.st_size
+    ):
+        response = HttpResponseNotModified()
+    else:
+        accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        serve_path, encoding = full_path, None
+        for suffix, name, _ in COMPRESSORS:
+            if name in accepted and os.path.isfile(full_path + suffix):
+                serve_path, encoding = full_path + suffix, name
+                break
+        content_type, _ = mimetypes.guess_type(full_path)
+        response = FileResponse(
+            open(serve_path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Vary'] = 'Accept-Encoding'
+    response['Cache-Control'] = IMMUTABLE if hashed else 'no-cache'
+    return response
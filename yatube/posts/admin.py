@@ -1,14 +1,126 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME, ActionForm
+from django.db.models import F
+from django.template.response import TemplateResponse
 
+from .cache import FEED_SCOPE
+from .counts import estimated_count
+from .lookups import group_choices
 from .models import Post, Group
+from .search import filter_posts
+from .utils import WindowedPaginator
+
+
+NO_GROUP = 'none'
+
+
+def move_choices():
+    """Пустой вариант означает «группа не выбрана», поэтому снятие
+    группы — отдельный явный вариант.
+    """
+    empty, *groups = group_choices()
+    return [empty, (NO_GROUP, 'Без группы'), *groups]
+
+
+class PostActionForm(ActionForm):
+    # Необязательно: форма действий одна и для удаления.
+    group = forms.ChoiceField(
+        label='Группа', choices=move_choices, required=False
+    )
 
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    # По индексу post_pub_date_idx.
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
+    # Без COUNT(*) по всей таблице на каждой странице списка.
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = ('move_to_group', 'delete_posts')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по тексту идёт через полнотекстовый индекс, а не LIKE.
+        if not search_term:
+            return queryset, False
+        return filter_posts(queryset, search_term), False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        # Число постов — по статистике таблицы или из кеша до следующей
+        # записи в ленту, а не COUNT(*) на каждый запрос.
+        return WindowedPaginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            count_posts=lambda posts: estimated_count(posts, [FEED_SCOPE]),
+        )
+
+    def get_actions(self, request):
+        # Стандартное удаление грузит каждый пост и шлёт сигналы по одному.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'group':
+            # Список групп один на все строки list_editable и берётся
+            # из кеша, а не запросом в каждой строке.
+            field.choices = group_choices()
+        return field
+
+    def move_to_group(self, request, queryset):
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid() or not form.cleaned_data['group']:
+            self.message_user(
+                request, 'Выберите группу или «Без группы»', messages.ERROR
+            )
+            return
+        group = form.cleaned_data['group']
+        # Перенос — не правка текста: edit_date остаётся прежним.
+        moved = queryset.update(
+            group_id=None if group == NO_GROUP else int(group),
+            edit_date=F('edit_date'),
+        )
+        self.message_user(request, f'Перенесено постов: {moved}')
+    move_to_group.short_description = 'Перенести в группу'
+    move_to_group.allowed_permissions = ('change',)
+
+    def delete_posts(self, request, queryset):
+        # Как delete_selected: сначала страница подтверждения, которая
+        # присылает тот же выбор обратно с post=yes.
+        if request.POST.get('post') != 'yes':
+            return self.confirm_delete_posts(request, queryset)
+        deleted = queryset.bulk_delete()
+        self.message_user(request, f'Удалено постов: {deleted}')
+    delete_posts.short_description = 'Удалить выбранные посты'
+    delete_posts.allowed_permissions = ('delete',)
+
+    def confirm_delete_posts(self, request, queryset):
+        opts = self.model._meta
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Удалить выбранные посты?',
+            'opts': opts,
+            'media': self.media,
+            'count': queryset.count(),
+            'sample': queryset.select_related('author')[:10],
+            'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across') == '1',
+            'action_checkbox_name': ACTION_CHECKBOX_NAME,
+        }
+        request.current_app = self.admin_site.name
+        return TemplateResponse(
+            request,
+            f'admin/{opts.app_label}/{opts.model_name}/'
+            'delete_posts_confirmation.html',
+            context,
+        )
 
 
 admin.site.register(Post, PostAdmin)
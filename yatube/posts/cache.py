@@ -0,0 +1,201 @@
+import functools
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.views.decorators.http import condition
+
+from core.replicas import replica_lag_bucket
+from .models import Group, Post, User
+
+FEED_SCOPE = 'index'
+GENERATION_KEY = 'posts:generation:{}'
+PAGE_KEY = 'posts:page:{}'
+BUMPED_KEY = 'posts:bumped:{}'
+
+
+def group_scope(slug):
+    return f'group:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def feed_scopes(author_ids=(), group_ids=()):
+    """Области лент, в которые попадают посты этих авторов и групп."""
+    author_ids = set(author_ids) - {None}
+    group_ids = set(group_ids) - {None}
+    scopes = [FEED_SCOPE]
+    if author_ids:
+        scopes.extend(
+            author_scope(username) for username in User.objects.filter(
+                pk__in=author_ids
+            ).values_list('username', flat=True)
+        )
+    if group_ids:
+        scopes.extend(
+            group_scope(slug) for slug in Group.objects.filter(
+                pk__in=group_ids
+            ).values_list('slug', flat=True)
+        )
+    return scopes
+
+
+def get_generations(scopes):
+    """Текущие поколения областей. Отсутствующее в кеше поколение
+    заводится заново от текущего времени, чтобы не совпасть со старым.
+    """
+    keys = [GENERATION_KEY.format(scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def incr_generations(scopes):
+    for scope in scopes:
+        key = GENERATION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+    # Время смены в секундах, как в Last-Modified. Оно строго растёт,
+    # чтобы две смены за одну секунду не дали клиенту 304.
+    now = int(time.time())
+    keys = [BUMPED_KEY.format(scope) for scope in scopes]
+    bumped = cache.get_many(keys)
+    cache.set_many(
+        {key: max(now, bumped.get(key, 0) + 1) for key in keys}, None
+    )
+
+
+def bump(scopes):
+    """Сменяет поколения областей сразу и ещё раз после коммита
+    текущей транзакции. Пока запись не закоммичена, читатель видит
+    старые строки и может закешировать их под новым поколением; второе
+    поколение делает такую страницу недостижимой.
+    """
+    scopes = set(scopes)
+    incr_generations(scopes)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: incr_generations(scopes))
+
+
+def cache_page_by_scopes(get_scopes):
+    """Кеширует страницу, пока не сменится поколение ни одной из
+    областей, которые вернула get_scopes(**kwargs). Тело страницы общее
+    для всех посетителей: шапку с пользователем FragmentMiddleware
+    подставляет уже после кеша.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or not settings.POSTS_PAGE_CACHE:
+                return view(request, *args, **kwargs)
+            generations = get_generations(get_scopes(**kwargs))
+            key = PAGE_KEY.format(
+                generations_digest(request.get_full_path(), generations)
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                # Реплика могла ещё не получить последнюю запись:
+                # такая страница живёт в кеше не дольше отставания.
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type']),
+                    settings.REPLICA_MAX_LAG
+                    if getattr(request, 'replica', False)
+                    else settings.POSTS_PAGE_CACHE_TIMEOUT,
+                )
+            return response
+        return wrapper
+    return decorator
+
+
+def generations_digest(*parts):
+    return hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+
+
+def page_etag(request, scopes):
+    """ETag страницы: адрес, зритель (от него зависит шапка), поколения
+    областей и, при чтении с реплики, интервал её отставания.
+    Считается без обращения к базе.
+    """
+    viewer = request.user.pk if request.user.is_authenticated else ''
+    return generations_digest(
+        request.get_full_path(), viewer, get_generations(scopes),
+        replica_lag_bucket(request),
+    )
+
+
+def scopes_last_modified(scopes):
+    """Время последней смены поколения областей. В отличие от
+    Max(edit_date), его сдвигают и удаление поста, и переименование
+    группы или автора. Пропавшее из кеша время заводится от текущего.
+    """
+    keys = [BUMPED_KEY.format(scope) for scope in scopes]
+    bumped = cache.get_many(keys)
+    for key in keys:
+        if key not in bumped:
+            cache.add(key, int(time.time()), None)
+            bumped[key] = cache.get(key)
+    return datetime.fromtimestamp(max(bumped.values()), timezone.utc)
+
+
+def feed_page(get_scopes):
+    """Условный GET (ETag и Last-Modified) поверх кеша страницы ленты.
+
+    get_scopes(**kwargs) возвращает области страницы.
+    """
+    def decorator(view):
+        return condition(
+            etag_func=lambda request, **kwargs: page_etag(
+                request, get_scopes(**kwargs)
+            ),
+            last_modified_func=lambda request, **kwargs: (
+                scopes_last_modified(get_scopes(**kwargs))
+            ),
+        )(cache_page_by_scopes(get_scopes)(view))
+    return decorator
+
+
+def post_meta(request, post_id):
+    if not hasattr(request, '_post_meta'):
+        request._post_meta = Post.objects.filter(pk=post_id).values(
+            'author__username', 'group__slug'
+        ).first()
+    return request._post_meta
+
+
+def post_scopes(request, post_id):
+    """Области страницы поста: правка поста, как и переименование
+    автора или группы, меняет их поколения.
+    """
+    meta = post_meta(request, post_id)
+    if meta is None:
+        return None
+    scopes = [author_scope(meta['author__username'])]
+    if meta['group__slug'] is not None:
+        scopes.append(group_scope(meta['group__slug']))
+    return scopes
+
+
+def post_etag(request, post_id):
+    scopes = post_scopes(request, post_id)
+    return scopes and page_etag(request, scopes)
+
+
+def post_last_modified(request, post_id):
+    scopes = post_scopes(request, post_id)
+    return scopes and scopes_last_modified(scopes)
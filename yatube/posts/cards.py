@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from .cache import generations_digest
+from .thumbnails import prefetch_thumbnails, ready_thumbnail
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+CARD_KEY = 'posts:card:{}:{}'
+
+
+def card_version(post, show_group):
+    """Всё, что выводит карточка, кроме самого поста: смена имени автора,
+    группы, правка поста (edit_date) или HTML текста дают новый ключ,
+    и старая карточка просто перестаёт читаться. text_html входит
+    отдельно: render_post_texts переписывает его, не трогая edit_date.
+    """
+    author = post.author
+    parts = [
+        post.edit_date.isoformat(), post.text_html, post.image.name,
+        author.username, author.get_full_name(), show_group,
+    ]
+    if show_group and post.group_id is not None:
+        parts.extend((post.group.slug, post.group.title))
+    return generations_digest(*parts)
+
+
+def card_is_final(post):
+    """Карточку с картинкой без готовой миниатюры не кешируем:
+    после работы пула она должна отрисоваться заново.
+    """
+    return not post.image or ready_thumbnail(post.image.name, 'list')
+
+
+def render_cards(posts, show_group=True):
+    """HTML карточек постов страницы: готовые читаются одним
+    get_many, недостающие рисуются и сохраняются одним set_many.
+    """
+    posts = list(posts)
+    keys = [
+        CARD_KEY.format(post.pk, card_version(post, show_group))
+        for post in posts
+    ]
+    cards = cache.get_many(keys)
+    prefetch_thumbnails(
+        [
+            post.image.name for key, post in zip(keys, posts)
+            if post.image and key not in cards
+        ],
+        'list',
+    )
+    template = get_template(CARD_TEMPLATE)
+    rendered = {}
+    for key, post in zip(keys, posts):
+        if key in cards:
+            continue
+        cards[key] = template.render({'post': post, 'show_group': show_group})
+        if card_is_final(post):
+            rendered[key] = cards[key]
+    if rendered:
+        cache.set_many(rendered, settings.POSTS_CARD_CACHE_TIMEOUT)
+    return [mark_safe(cards[key]) for key in keys]
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .cache import generations_digest, get_generations
+
+COUNT_KEY = 'posts:count:{}'
+
+
+def exact_count(posts, scopes=()):
+    return posts.count()
+
+
+def cached_count(posts, scopes=()):
+    """COUNT(*) из кеша. Запись в любую из областей меняет поколение
+    и тем самым ключ, таймаут ограничивает срок жизни на случай
+    изменений в обход сигналов.
+    """
+    key = COUNT_KEY.format(generations_digest(
+        str(posts.query), scopes, get_generations(scopes)
+    ))
+    count = cache.get(key)
+    if count is None:
+        count = posts.count()
+        cache.set(key, count, settings.POSTS_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def table_estimate(model, using):
+    """Число строк таблицы по статистике планировщика или None,
+    если статистики нет (в SQLite она появляется после ANALYZE).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            if 'sqlite_stat1' not in connection.introspection.table_names():
+                return None
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                [table],
+            )
+            row = cursor.fetchone()
+            return int(row[0].split()[0]) if row else None
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE relname = %s', [table]
+            )
+            row = cursor.fetchone()
+            return int(row[0]) if row and row[0] >= 0 else None
+    return None
+
+
+def estimated_count(posts, scopes=()):
+    """Оценка по статистике таблицы. Годится только для выборки без
+    условий; для остальных и при отсутствии статистики — cached_count.
+    """
+    if not posts.query.where:
+        estimate = table_estimate(posts.model, posts.db)
+        if estimate is not None:
+            return estimate
+    return cached_count(posts, scopes)
+
+
+COUNT_STRATEGIES = {
+    'exact': exact_count,
+    'cached': cached_count,
+    'estimated': estimated_count,
+}
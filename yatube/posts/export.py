@@ -0,0 +1,75 @@
+import csv
+import json
+
+from django.conf import settings
+
+# Те же колонки, что понимает команда import_posts.
+EXPORT_FIELDS = ('id', 'text', 'author', 'group', 'pub_date', 'edit_date')
+EXPORT_VALUES = (
+    'id', 'text', 'author__username', 'group__slug', 'pub_date', 'edit_date'
+)
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+def iter_posts(posts, chunk_size=None, limit=None):
+    """Перебирает посты пачками по chunk_size строк, продолжая
+    с последнего id. В памяти одновременно держится только одна пачка.
+    С limit отдаёт не больше limit первых постов.
+    """
+    chunk_size = chunk_size or settings.POSTS_EXPORT_CHUNK_SIZE
+    posts = posts.order_by('id').values_list(*EXPORT_VALUES)
+    last_id = 0
+    while True:
+        size = chunk_size if limit is None else min(chunk_size, limit)
+        chunk = list(posts.filter(id__gt=last_id)[:size])
+        for row in chunk:
+            yield dict(zip(EXPORT_FIELDS, row))
+        if limit is not None:
+            limit -= len(chunk)
+        if len(chunk) < chunk_size or limit == 0:
+            return
+        last_id = chunk[-1][0]
+
+
+def serialize(row):
+    return {
+        **row,
+        'group': row['group'] or '',
+        'pub_date': row['pub_date'].isoformat(),
+        'edit_date': row['edit_date'].isoformat(),
+    }
+
+
+class Echo:
+    """Файловый объект для csv.writer, который возвращает строку
+    вместо записи в буфер.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        row = serialize(row)
+        yield writer.writerow([row[name] for name in EXPORT_FIELDS])
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        yield json.dumps(serialize(row), ensure_ascii=False) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': csv_lines,
+    'jsonl': jsonl_lines,
+}
+
+
+def export_lines(posts, file_format, chunk_size=None, limit=None):
+    return EXPORT_FORMATS[file_format](iter_posts(posts, chunk_size, limit))
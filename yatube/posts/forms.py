@@ -7,3 +7,13 @@ class PostForm(forms.ModelForm):
     class Meta():
         model = Post
         fields = ('text', 'group')
+
+
+class PostImageForm(forms.ModelForm):
+    """Картинка поста отдельной формой: PostForm остаётся
+    с двумя полями.
+    """
+
+    class Meta():
+        model = Post
+        fields = ('image',)
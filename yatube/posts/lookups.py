@@ -0,0 +1,132 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+
+from core.replicas import current_replica
+from .models import Group, User
+
+LOOKUP_KEY = 'posts:lookup:{}:{}'
+GROUP_CHOICES_KEY = 'posts:group-choices'
+
+
+class LookupCache:
+    """Объекты по уникальному полю: ограниченный LRU в процессе поверх
+    общего кеша. Отсутствие объекта кешируется так же, как объект.
+
+    Сохранение и удаление сбрасывают запись в этом процессе и в общем
+    кеше (posts.signals); копии в LRU других процессов живут не дольше
+    LOOKUP_LOCAL_TIMEOUT. Страницы, которые кешируются по поколениям
+    областей, читают с local=False: иначе страница со старым объектом
+    из чужого LRU закешировалась бы под новым поколением.
+    """
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+
+    def key(self, value):
+        # Значение приходит из адреса: хеш даёт ключ допустимой для
+        # memcached длины и из ASCII.
+        digest = hashlib.md5(str(value).encode()).hexdigest()
+        return LOOKUP_KEY.format(self.model._meta.label_lower, digest)
+
+    def get_local(self, value):
+        with self.lock:
+            entry = self.local.get(value)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self.local[value]
+                return None
+            self.local.move_to_end(value)
+            return entry[0]
+
+    def set_local(self, value, found, timeout=None):
+        timeout = min(settings.LOOKUP_LOCAL_TIMEOUT, timeout or float('inf'))
+        with self.lock:
+            self.local[value] = (found, time.monotonic() + timeout)
+            self.local.move_to_end(value)
+            while len(self.local) > settings.LOOKUP_CACHE_SIZE:
+                self.local.popitem(last=False)
+
+    def get(self, value, local=True):
+        """Объект или None. В кешах хранится кортеж: (объект,)
+        или () для отсутствующего.
+        """
+        found = self.get_local(value) if local else None
+        if found is None:
+            found = cache.get(self.key(value))
+            timeout = None
+            if found is None:
+                found = tuple(
+                    self.model.objects.filter(**{self.field: value})[:1]
+                )
+                timeout = (
+                    settings.LOOKUP_CACHE_TIMEOUT if found
+                    else settings.LOOKUP_MISS_TIMEOUT
+                )
+                if current_replica.get():
+                    # Реплика могла ещё не получить новую группу или
+                    # пользователя: как и страница, запись с неё живёт
+                    # не дольше отставания.
+                    timeout = min(timeout, settings.REPLICA_MAX_LAG)
+                cache.set(self.key(value), found, timeout)
+            self.set_local(value, found, timeout)
+        return found[0] if found else None
+
+    def get_or_404(self, value, local=True):
+        found = self.get(value, local)
+        if found is None:
+            raise Http404(f'{self.model._meta.object_name} не найден')
+        return found
+
+    def forget(self, *values):
+        """Сбрасывает записи сразу и ещё раз после коммита, как
+        posts.cache.bump: иначе читатель успел бы вернуть в общий кеш
+        незакоммиченное старое значение.
+        """
+        values = {value for value in values if value is not None}
+
+        def delete():
+            with self.lock:
+                for value in values:
+                    self.local.pop(value, None)
+            cache.delete_many([self.key(value) for value in values])
+
+        delete()
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(delete)
+
+
+def group_choices():
+    """Варианты выбора группы для форм админки: один запрос до
+    следующего изменения групп (posts.signals).
+    """
+    choices = cache.get(GROUP_CHOICES_KEY)
+    if choices is None:
+        groups = Group.objects.order_by('title')
+        choices = [('', '---------')] + [
+            (group.pk, str(group)) for group in groups
+        ]
+        cache.set(GROUP_CHOICES_KEY, choices, settings.LOOKUP_CACHE_TIMEOUT)
+    return choices
+
+
+def forget_group_choices():
+    cache.delete(GROUP_CHOICES_KEY)
+
+
+group_by_slug = LookupCache(Group, 'slug')
+user_by_username = LookupCache(User, 'username')
+LOOKUPS = {
+    Group: group_by_slug,
+    User: user_by_username,
+}
@@ -0,0 +1,56 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+
+from posts.models import Post
+
+TEMPLATES = {
+    'linebreaks': (
+        '{% for post in posts %}<p>{{ post.text|linebreaks }}</p>'
+        '{% endfor %}'
+    ),
+    'text_html': (
+        '{% for post in posts %}<p>{{ post.rendered_text }}</p>'
+        '{% endfor %}'
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время отрисовки текстов страницы постов: фильтр '
+        'linebreaks на каждый показ против готового Post.text_html.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=settings.MAX_POSTS,
+            help='Постов на странице.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=1000,
+            help='Сколько раз отрисовать страницу (берётся медиана).',
+        )
+
+    def handle(self, *args, **options):
+        posts = list(Post.objects.all()[:options['posts']])
+        if not posts:
+            raise CommandError('В базе нет постов')
+        engine = engines['django']
+        results = {}
+        for name, code in TEMPLATES.items():
+            template = engine.from_string(code)
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                template.render({'posts': posts})
+                timings.append(time.perf_counter() - started)
+            results[name] = statistics.median(timings) * 1000
+            self.stdout.write(f'{name:<12} {results[name]:.3f} мс')
+        self.stdout.write(
+            f'Постов: {len(posts)}, ускорение '
+            f'{results["linebreaks"] / results["text_html"]:.1f}x'
+        )
@@ -0,0 +1,51 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.search import filter_posts
+
+
+def measure(posts, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = posts.count()
+        list(posts.values_list('id', flat=True)[:100])
+        timings.append(time.perf_counter() - started)
+    return found, statistics.median(timings) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск по тексту постов через LIKE (как в админке '
+        'до индекса) и через полнотекстовый индекс FTS5.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='+', help='Поисковые запросы.')
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз повторить каждый замер (берётся медиана).',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.order_by('-pub_date')
+        self.stdout.write(
+            f'Постов в базе: {posts.count()}\n'
+            f'{"запрос":<20} {"LIKE, шт":>9} {"LIKE, мс":>9} '
+            f'{"FTS, шт":>9} {"FTS, мс":>9} {"ускорение":>10}'
+        )
+        for query in options['queries']:
+            like_found, like_ms = measure(
+                posts.filter(text__icontains=query), options['repeat']
+            )
+            fts_found, fts_ms = measure(
+                filter_posts(posts, query), options['repeat']
+            )
+            self.stdout.write(
+                f'{query:<20} {like_found:>9} {like_ms:>9.2f} '
+                f'{fts_found:>9} {fts_ms:>9.2f} '
+                f'{like_ms / max(fts_ms, 1e-6):>9.1f}x'
+            )
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import EXPORT_FORMATS, export_lines
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты в CSV или JSONL: все, автора или группы. '
+        'Файл подходит для import_posts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=sorted(EXPORT_FORMATS), default='jsonl',
+            help='Формат выгрузки.',
+        )
+        parser.add_argument('--author', help='Username автора.')
+        parser.add_argument('--group', help='Slug группы.')
+        parser.add_argument(
+            '--output', default='-',
+            help='Файл выгрузки или «-» для stdout.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Сколько постов читать из базы за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.all()
+        if options['author']:
+            author = User.objects.filter(username=options['author']).first()
+            if author is None:
+                raise CommandError(f'Нет автора {options["author"]}')
+            posts = posts.filter(author=author)
+        if options['group']:
+            group = Group.objects.filter(slug=options['group']).first()
+            if group is None:
+                raise CommandError(f'Нет группы {options["group"]}')
+            posts = posts.filter(group=group)
+        if options['chunk_size'] is not None and options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля')
+        lines = export_lines(posts, options['format'], options['chunk_size'])
+        if options['output'] == '-':
+            output = self.stdout
+            for line in lines:
+                output.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as output:
+            output.writelines(lines)
+        self.stderr.write(f'Выгрузка записана в {options["output"]}')
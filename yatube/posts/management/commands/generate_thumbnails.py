@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.cache import bump, feed_scopes
+from posts.models import Post
+from posts.thumbnails import create_thumbnails, has_thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт недостающие миниатюры картинок постов. Пул потоков '
+        'posts.thumbnails держит очередь в памяти, и картинки, '
+        'загруженные перед перезапуском сервера, остаются без миниатюр.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        posts = Post.objects.exclude(image='').order_by('id')
+        generated = last_id = 0
+        while True:
+            chunk = list(posts.filter(id__gt=last_id).values_list(
+                'id', 'image', 'author_id', 'group_id'
+            )[:batch_size])
+            if not chunk:
+                break
+            last_id = chunk[-1][0]
+            changed = [
+                (name, author_id, group_id)
+                for _, name, author_id, group_id in chunk
+                if not has_thumbnails(name)
+            ]
+            for name, *_ in changed:
+                create_thumbnails(name)
+            if changed:
+                bump(feed_scopes(
+                    {author_id for _, author_id, _ in changed},
+                    {group_id for *_, group_id in changed},
+                ))
+            generated += len(changed)
+        self.stdout.write(self.style.SUCCESS(
+            f'Созданы миниатюры для постов: {generated}'
+        ))
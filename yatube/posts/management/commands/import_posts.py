@@ -0,0 +1,219 @@
+import csv
+import json
+import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.models import Group, ImportCheckpoint, Post
+
+User = get_user_model()
+
+TIMESTAMP_FIELDS = ('pub_date', 'edit_date')
+
+
+@contextmanager
+def keep_timestamps():
+    """Отключает auto_now/auto_now_add, чтобы bulk_create записал даты
+    из архива, а не текущее время.
+    """
+    fields = [Post._meta.get_field(name) for name in TIMESTAMP_FIELDS]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def read_rows(source, file_format):
+    if file_format == 'csv':
+        yield from csv.DictReader(source)
+        return
+    for line in source:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        # Битая строка остаётся строкой архива и пропускается в
+        # build_posts, чтобы позиции контрольной точки не сдвинулись.
+        yield row if isinstance(row, dict) else {}
+
+
+def parse_pub_date(value):
+    if not value:
+        return None
+    pub_date = parse_datetime(value)
+    if pub_date is None:
+        raise ValueError(f'Некорректная дата: {value}')
+    if timezone.is_naive(pub_date):
+        pub_date = timezone.make_aware(pub_date, timezone.utc)
+    return pub_date
+
+
+class Lookup:
+    """Словарь «имя → id» для авторов или групп, который дополняется
+    одним запросом на пачку строк.
+    """
+
+    def __init__(self, model, field, create=None):
+        self.model = model
+        self.field = field
+        self.create = create
+        self.ids = {}
+
+    def resolve(self, names):
+        missing = {name for name in names if name} - self.ids.keys()
+        if not missing:
+            return
+        self.ids.update(
+            self.model.objects.filter(**{f'{self.field}__in': missing})
+            .values_list(self.field, 'id')
+        )
+        if self.create is not None:
+            for name in missing - self.ids.keys():
+                self.ids[name] = self.create(name).id
+
+    def get(self, name):
+        return self.ids.get(name)
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково импортирует посты из JSONL или CSV пачками bulk_create. '
+        'Поля строки: text, author (username), group (slug), pub_date.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл архива или «-» для stdin.')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат файла; по умолчанию определяется по расширению.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов вставлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Имя контрольной точки в базе: импорт продолжится с '
+                 'места сбоя.',
+        )
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Создавать неизвестных авторов и группы, а не пропускать.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        create = options['create_missing']
+        self.authors = Lookup(
+            User, 'username',
+            User.objects.create_user if create else None,
+        )
+        self.groups = Lookup(
+            Group, 'slug',
+            (lambda slug: Group.objects.create(
+                title=slug, slug=slug, description=''
+            )) if create else None,
+        )
+        self.skipped = 0
+        self.checkpoint = options['checkpoint']
+        position = self.read_checkpoint()
+        if position:
+            self.stdout.write(f'Продолжаем со строки {position + 1}')
+
+        source = (
+            sys.stdin if path == '-'
+            else open(path, encoding='utf-8', newline='')
+        )
+        try:
+            rows = islice(read_rows(source, file_format), position, None)
+            imported = self.import_rows(
+                rows, position, options['batch_size']
+            )
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано постов: {imported}, пропущено строк: '
+            f'{self.skipped}'
+        ))
+
+    def import_rows(self, rows, position, batch_size):
+        imported = 0
+        started = time.monotonic()
+        with keep_timestamps():
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                posts = self.build_posts(batch)
+                position += len(batch)
+                # Пачка и контрольная точка коммитятся вместе.
+                with transaction.atomic():
+                    Post.objects.bulk_create(posts, batch_size=batch_size)
+                    self.write_checkpoint(position)
+                imported += len(posts)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'Строк обработано: {position}, постов добавлено: '
+                    f'{imported}, {imported / max(elapsed, 1e-6):.0f} пост/с'
+                )
+        return imported
+
+    def build_posts(self, batch):
+        self.authors.resolve(row.get('author') for row in batch)
+        self.groups.resolve(row.get('group') for row in batch)
+        now = timezone.now()
+        posts = []
+        for row in batch:
+            author_id = self.authors.get(row.get('author'))
+            group_id = self.groups.get(row.get('group'))
+            try:
+                pub_date = parse_pub_date(row.get('pub_date')) or now
+            except ValueError:
+                pub_date = None
+            if (
+                not row.get('text') or author_id is None or pub_date is None
+                or (row.get('group') and group_id is None)
+            ):
+                self.skipped += 1
+                continue
+            posts.append(Post(
+                text=row['text'],
+                author_id=author_id,
+                group_id=group_id,
+                pub_date=pub_date,
+                edit_date=pub_date,
+            ))
+        return posts
+
+    def read_checkpoint(self):
+        if not self.checkpoint:
+            return 0
+        return ImportCheckpoint.objects.filter(
+            name=self.checkpoint
+        ).values_list('position', flat=True).first() or 0
+
+    def write_checkpoint(self, position):
+        if not self.checkpoint:
+            return
+        ImportCheckpoint.objects.update_or_create(
+            name=self.checkpoint, defaults={'position': position}
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.models import PostCounter
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов авторов и ищет расхождения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только найти расхождения, ничего не исправляя.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            drift = PostCounter.objects.find_drift()
+        else:
+            drift = PostCounter.objects.rebuild()
+        for author_id, (stored, actual) in sorted(drift.items()):
+            self.stdout.write(
+                f'Автор {author_id}: в счётчике {stored}, постов {actual}'
+            )
+        if options['check'] and drift:
+            raise CommandError(f'Счётчики разошлись у {len(drift)} авторов')
+        verb = 'Найдено' if options['check'] else 'Исправлено'
+        self.stdout.write(
+            self.style.SUCCESS(f'{verb} расхождений: {len(drift)}')
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from posts.search import (
+    has_search_index, install_search_triggers, rebuild_search_index
+)
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс постов (SQLite FTS5).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Алиас базы данных.',
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not has_search_index(using):
+            raise CommandError(
+                'Полнотекстовый индекс есть только в SQLite после migrate'
+            )
+        install_search_triggers(using)
+        rebuild_search_index(using)
+        self.stdout.write(self.style.SUCCESS('Индекс поиска перестроен'))
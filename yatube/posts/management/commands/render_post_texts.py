@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from posts.cache import bump, feed_scopes
+from posts.models import Post, render_text
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет HTML текста постов (Post.text_html) пачками. '
+        'По умолчанию только пустые; --all перерисовывает все посты, '
+        'например после изменения render_text.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перерисовать и уже заполненные посты.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        posts = Post.objects.order_by('id')
+        if not options['all']:
+            posts = posts.filter(text_html='')
+        # UPDATE напрямую: PostQuerySet.update сдвинул бы edit_date,
+        # а текст поста при этом не меняется.
+        sql = 'UPDATE {} SET {} = %s WHERE {} = %s'.format(
+            connection.ops.quote_name(Post._meta.db_table),
+            connection.ops.quote_name('text_html'),
+            connection.ops.quote_name('id'),
+        )
+        rendered = last_id = 0
+        while True:
+            chunk = list(posts.filter(id__gt=last_id).values_list(
+                'id', 'text', 'text_html', 'author_id', 'group_id'
+            )[:batch_size])
+            if not chunk:
+                break
+            last_id = chunk[-1][0]
+            changed = []
+            for post_id, text, text_html, author_id, group_id in chunk:
+                html = render_text(text)
+                if html != text_html:
+                    changed.append((html, post_id, author_id, group_id))
+            if changed:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(
+                        sql, [(html, post_id) for html, post_id, *_ in changed]
+                    )
+                bump(feed_scopes(
+                    {author_id for *_, author_id, _ in changed},
+                    {group_id for *_, group_id in changed},
+                ))
+            rendered += len(changed)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлён HTML постов: {rendered}'
+        ))
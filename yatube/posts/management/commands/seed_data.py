@@ -0,0 +1,239 @@
+import itertools
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from faker import Faker
+
+from posts.cache import bump, feed_scopes
+from posts.lookups import group_by_slug, user_by_username
+from posts.models import Group, Post, PostCounter, User, render_text
+from posts.search import deferred_search_index
+
+# Доля постов без группы.
+UNGROUPED_SHARE = 0.2
+
+# Состояние процесса-генератора: заполняется в init_worker один раз,
+# чтобы не передавать списки id с каждой пачкой.
+worker = {}
+
+
+def zipf_weights(count, exponent):
+    """Накопленные веса «богатые богатеют»: k-й по популярности автор
+    или группа получает долю, пропорциональную 1 / k ** exponent.
+    """
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+def init_worker(author_ids, group_ids, skew, locale):
+    worker['authors'] = author_ids
+    worker['author_weights'] = zipf_weights(len(author_ids), skew)
+    worker['groups'] = group_ids
+    worker['group_weights'] = zipf_weights(len(group_ids), skew)
+    worker['faker'] = Faker(locale)
+
+
+def generate_batch(task):
+    """Строки одной пачки постов. Пачка покрывает свой отрезок времени,
+    поэтому id постов растут вместе с pub_date, как в живой базе.
+    """
+    seed, size, start, span = task
+    rng = random.Random(seed)
+    faker = worker['faker']
+    faker.seed_instance(seed)
+    authors = rng.choices(
+        worker['authors'], cum_weights=worker['author_weights'], k=size
+    )
+    groups = worker['groups'] and rng.choices(
+        worker['groups'], cum_weights=worker['group_weights'], k=size
+    )
+    moments = sorted(rng.uniform(start, start + span) for _ in range(size))
+    texts = [
+        faker.paragraph(nb_sentences=rng.randint(1, 8)) for _ in range(size)
+    ]
+    return [
+        (
+            texts[n],
+            render_text(texts[n]),
+            authors[n],
+            groups[n] if groups and rng.random() >= UNGROUPED_SHARE else None,
+            moments[n],
+        )
+        for n in range(size)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу правдоподобными данными для профилирования: '
+        'пользователи, группы и посты с перекосом по авторам и группам. '
+        'Тексты генерируют несколько процессов, вставка идёт пачками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument(
+            '--days', type=int, default=3 * 365,
+            help='За сколько последних дней распределить pub_date.',
+        )
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель закона Ципфа для авторов и групп.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Процессов-генераторов; 1 — без отдельных процессов.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--locale', default='ru_RU')
+
+    def handle(self, *args, **options):
+        for name in ('users', 'posts', 'batch_size', 'workers', 'days'):
+            if options[name] < 1:
+                raise CommandError(f'--{name.replace("_", "-")} должен '
+                                   f'быть больше нуля')
+        if options['groups'] < 0:
+            raise CommandError('--groups не может быть отрицательным')
+        faker = Faker(options['locale'])
+        faker.seed_instance(options['seed'])
+        started = time.monotonic()
+        self.author_ids = author_ids = self.create_users(
+            faker, options['users']
+        )
+        self.group_ids = group_ids = self.create_groups(
+            faker, options['groups']
+        )
+        self.stdout.write(
+            f'Пользователей: {len(author_ids)}, групп: {len(group_ids)}'
+        )
+        tasks = self.tasks(options)
+        initargs = (
+            author_ids, group_ids, options['skew'], options['locale']
+        )
+        if options['workers'] == 1:
+            init_worker(*initargs)
+            self.insert(
+                map(generate_batch, tasks), options['posts'], started
+            )
+            return
+        # Дочерние процессы не должны наследовать открытое соединение.
+        connections.close_all()
+        with Pool(options['workers'], init_worker, initargs) as pool:
+            self.insert(
+                pool.imap(generate_batch, tasks), options['posts'], started
+            )
+
+    def create_users(self, faker, count):
+        last_id = User.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        password = make_password(None)
+        users = [
+            User(
+                username=f'{faker.user_name()}{last_id + n}',
+                first_name=faker.first_name(),
+                last_name=faker.last_name(),
+                password=password,
+            )
+            for n in range(1, count + 1)
+        ]
+        User.objects.bulk_create(users, batch_size=500)
+        # bulk_create не шлёт сигналов: сбрасываем закешированные промахи.
+        user_by_username.forget(*(user.username for user in users))
+        return list(User.objects.filter(id__gt=last_id).order_by(
+            'id'
+        ).values_list('id', flat=True))
+
+    def create_groups(self, faker, count):
+        last_id = Group.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        groups = []
+        for n in range(1, count + 1):
+            title = faker.catch_phrase()
+            groups.append(Group(
+                title=title,
+                slug=f'{slugify(title)[:40] or "group"}-{last_id + n}',
+                description=faker.paragraph(),
+            ))
+        Group.objects.bulk_create(groups, batch_size=500)
+        group_by_slug.forget(*(group.slug for group in groups))
+        return list(Group.objects.filter(id__gt=last_id).order_by(
+            'id'
+        ).values_list('id', flat=True))
+
+    def tasks(self, options):
+        total, size = options['posts'], options['batch_size']
+        count = -(-total // size)
+        span = timedelta(days=options['days']).total_seconds()
+        start = timezone.now().timestamp() - span
+        for n in range(count):
+            yield (
+                options['seed'] * 1000003 + n,
+                min(size, total - n * size),
+                start + span * n / count,
+                span / count,
+            )
+
+    def insert(self, batches, total, started):
+        if connection.vendor == 'sqlite' and not connection.in_atomic_block:
+            # База для профилирования: сохранность при сбое питания
+            # не нужна, а без fsync вставка в разы быстрее.
+            # Внутри транзакции SQLite менять режим не даёт.
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA synchronous = OFF')
+        # Миллионы строк вставляются executemany в обход ORM: подготовка
+        # значений в bulk_create обходится дороже самой вставки. Счётчики,
+        # поколения кеша и поисковый индекс обновляются один раз в конце.
+        fields = [
+            Post._meta.get_field(name)
+            for name in (
+                'text', 'text_html', 'author', 'group', 'pub_date',
+                'edit_date', 'image',
+            )
+        ]
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            connection.ops.quote_name(Post._meta.db_table),
+            ', '.join(
+                connection.ops.quote_name(field.column) for field in fields
+            ),
+            ', '.join(['%s'] * len(fields)),
+        )
+        adapt = connection.ops.adapt_datetimefield_value
+        inserted = 0
+        with deferred_search_index():
+            for rows in batches:
+                params = []
+                for text, text_html, author_id, group_id, moment in rows:
+                    pub_date = adapt(
+                        datetime.fromtimestamp(moment, timezone.utc)
+                    )
+                    params.append((
+                        text, text_html, author_id, group_id, pub_date,
+                        pub_date, '',
+                    ))
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(sql, params)
+                inserted += len(params)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'Постов: {inserted}/{total}, '
+                    f'{inserted / max(elapsed, 1e-6):.0f} пост/с'
+                )
+        PostCounter.objects.rebuild(self.author_ids)
+        bump(feed_scopes(self.author_ids, self.group_ids))
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с'
+        ))
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:48
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_post_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostCounter = apps.get_model('posts', 'PostCounter')
+    PostCounter.objects.bulk_create(
+        PostCounter(author_id=author_id, posts_count=total)
+        for author_id, total in Post.objects.order_by().values('author_id')
+        .annotate(total=Count('id')).values_list('author_id', 'total')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0005_post_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCounter',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+            ],
+        ),
+        migrations.RunPython(fill_post_counters, migrations.RunPython.noop),
+    ]
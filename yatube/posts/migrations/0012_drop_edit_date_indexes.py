@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:58
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_edit_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_author_edit_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_group_edit_date_idx',
+        ),
+    ]
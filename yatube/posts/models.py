@@ -1,10 +1,22 @@
-from django.db import models
+from collections import Counter
+
+from django.db import models, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.html import linebreaks
+from django.utils.safestring import mark_safe
 
 
 User = get_user_model()
 
 
+def render_text(text):
+    """HTML текста поста: то же, что фильтр linebreaks в шаблоне."""
+    return linebreaks(text, autoescape=True)
+
+
 class Group(models.Model):
     title = models.CharField('Название группы', max_length=200)
     slug = models.SlugField('Заголовок', unique=True)
@@ -14,15 +26,104 @@ class Group(models.Model):
         return (self.title)
 
 
+class PostQuerySet(models.QuerySet):
+    def feed(self):
+        """Посты ленты вместе с автором и группой одним запросом."""
+        return self.select_related('author', 'group')
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .cache import bump, feed_scopes
+
+        objs = list(objs)
+        for post in objs:
+            post.text_html = render_text(post.text)
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            for author_id, added in Counter(
+                post.author_id for post in objs
+            ).items():
+                PostCounter.objects.add(author_id, added)
+        bump(feed_scopes(
+            {post.author_id for post in objs},
+            {post.group_id for post in objs},
+        ))
+        return objs
+
+    def update(self, **kwargs):
+        from .cache import bump, feed_scopes
+
+        with transaction.atomic(using=self.db):
+            affected = set(
+                self.order_by().values_list('author_id', 'group_id').distinct()
+            )
+            kwargs.setdefault('edit_date', timezone.now())
+            if 'text' in kwargs:
+                # Для выражения вместо строки HTML не посчитать: шаблоны
+                # отрисуют text, пока render_post_texts не заполнит поле.
+                text = kwargs['text']
+                kwargs['text_html'] = (
+                    render_text(text) if isinstance(text, str) else ''
+                )
+            rows = super().update(**kwargs)
+            author_ids = {author_id for author_id, _ in affected}
+            group_ids = {group_id for _, group_id in affected}
+            for name, ids in (('author', author_ids), ('group', group_ids)):
+                value = kwargs.get(name, kwargs.get(f'{name}_id'))
+                ids.add(getattr(value, 'pk', value))
+            if 'author' in kwargs or 'author_id' in kwargs:
+                PostCounter.objects.rebuild(author_ids - {None})
+        bump(feed_scopes(author_ids, group_ids))
+        return rows
+
+    def bulk_delete(self, batch_size=500):
+        """Удаляет посты пачками по pk, без загрузки объектов и сигналов
+        на каждый пост. Работу обработчиков post_delete делает сам и на
+        всю выборку сразу: пересчитывает счётчики авторов, один раз
+        меняет поколения лент и после коммита удаляет миниатюры.
+
+        Пачки удаляются внутренним QuerySet._raw_delete. Он не
+        каскадирует, поэтому на Post не должно быть внешних ключей
+        (это проверяет test_bulk_delete_has_nothing_to_cascade).
+        """
+        from .cache import bump, feed_scopes
+        from .thumbnails import delete_thumbnails
+
+        with transaction.atomic(using=self.db):
+            rows = list(self.order_by().select_related(None).values_list(
+                'pk', 'author_id', 'group_id', 'image'
+            ))
+            deleted = 0
+            for start in range(0, len(rows), batch_size):
+                batch = [pk for pk, *_ in rows[start:start + batch_size]]
+                deleted += self.model.objects.filter(
+                    pk__in=batch
+                )._raw_delete(using=self.db)
+            author_ids = {author_id for _, author_id, *_ in rows}
+            PostCounter.objects.rebuild(author_ids)
+            delete_thumbnails(image for *_, image in rows)
+        bump(feed_scopes(author_ids, {group_id for *_, group_id, _ in rows}))
+        return deleted
+
+
 class Post(models.Model):
     text = models.TextField(
         'Текст новой записи',
         help_text='Введите текст записи'
     )
+    text_html = models.TextField(
+        'HTML текста',
+        blank=True,
+        editable=False,
+        help_text='Заполняется при сохранении из поля text'
+    )
     pub_date = models.DateTimeField(
         'Дата публикации',
         auto_now_add=True
     )
+    edit_date = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -38,9 +139,123 @@ class Post(models.Model):
         verbose_name='Группа',
         help_text='Группа, к которой будет относиться пост'
     )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True,
+        help_text='Миниатюры для лент создаются после загрузки'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('pub_date',), name='post_pub_date_idx'),
+            models.Index(
+                fields=('author', 'pub_date'), name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('group', 'pub_date'), name='post_group_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return (self.text[:15])
+
+    @property
+    def rendered_text(self):
+        """HTML текста; для строк, которые ещё не обработал
+        render_post_texts, считается на лету.
+        """
+        return mark_safe(self.text_html or render_text(self.text))
+
+    def save(self, *args, **kwargs):
+        self.text_html = render_text(self.text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'text_html'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Значения из базы нужны сигналам, чтобы заметить смену автора.
+        post._loaded_values = dict(zip(field_names, values))
+        return post
+
+
+class PostCounterManager(models.Manager):
+    def add(self, author_id, delta):
+        # Разошедшийся счётчик не уходит ниже нуля: иначе CHECK
+        # PositiveIntegerField сорвал бы удаление поста.
+        posts_count = Greatest(F('posts_count') + delta, 0)
+        counters = self.filter(author_id=author_id)
+        if counters.update(posts_count=posts_count) or delta < 0:
+            return
+        # Первый пост автора. Строку вставляет INSERT ... ON CONFLICT
+        # DO NOTHING: одновременный первый пост не упадёт на
+        # уникальности author_id, и оба прироста пройдут через UPDATE.
+        self.bulk_create(
+            [self.model(author_id=author_id)], ignore_conflicts=True
+        )
+        counters.update(posts_count=posts_count)
+
+    def find_drift(self, author_ids=None):
+        """Возвращает {author_id: (в счётчике, на самом деле)}
+        для авторов, у которых счётчик разошёлся с таблицей постов.
+        """
+        posts = Post.objects.order_by()
+        counters = self.all()
+        if author_ids is not None:
+            posts = posts.filter(author_id__in=author_ids)
+            counters = counters.filter(author_id__in=author_ids)
+        actual = dict(
+            posts.values('author_id')
+            .annotate(total=Count('id'))
+            .values_list('author_id', 'total')
+        )
+        stored = dict(counters.values_list('author_id', 'posts_count'))
+        drift = {}
+        for author_id in actual.keys() | stored.keys():
+            expected = actual.get(author_id, 0)
+            if stored.get(author_id) != expected:
+                drift[author_id] = (stored.get(author_id), expected)
+        return drift
+
+    def rebuild(self, author_ids=None):
+        drift = self.find_drift(author_ids)
+        for author_id, (_, expected) in drift.items():
+            self.update_or_create(
+                author_id=author_id, defaults={'posts_count': expected}
+            )
+        return drift
+
+
+class PostCounter(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_counter',
+        verbose_name='Автор'
+    )
+    posts_count = models.PositiveIntegerField('Число постов', default=0)
+
+    objects = PostCounterManager()
+
+    def __str__(self):
+        return f'{self.author_id}: {self.posts_count}'
+
+
+class ImportCheckpoint(models.Model):
+    """Сколько строк архива уже обработал import_posts. Пишется в той же
+    транзакции, что и пачка постов, поэтому после сбоя пачка не
+    вставляется второй раз.
+    """
+    name = models.CharField('Имя', max_length=255, unique=True)
+    position = models.PositiveIntegerField('Строк обработано', default=0)
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
+
+    def __str__(self):
+        return f'{self.name}: {self.position}'
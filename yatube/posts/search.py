@@ -0,0 +1,114 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connections
+
+SEARCH_TABLE = 'posts_post_fts'
+INSERT_TRIGGER = 'posts_post_fts_insert'
+TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_insert "
+    "AFTER INSERT ON posts_post BEGIN "
+    "INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_delete "
+    "AFTER DELETE ON posts_post BEGIN "
+    "INSERT INTO posts_post_fts(posts_post_fts, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS posts_post_fts_update "
+    "AFTER UPDATE OF text ON posts_post BEGIN "
+    "INSERT INTO posts_post_fts(posts_post_fts, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); "
+    "END",
+)
+
+
+def has_search_index(using):
+    connection = connections[using]
+    return (
+        connection.vendor == 'sqlite'
+        and SEARCH_TABLE in connection.introspection.table_names()
+    )
+
+
+def install_search_triggers(using='default', **kwargs):
+    if not has_search_index(using):
+        return
+    with connections[using].cursor() as cursor:
+        for trigger in TRIGGERS:
+            cursor.execute(trigger)
+
+
+def rebuild_search_index(using='default'):
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"
+        )
+
+
+@contextmanager
+def deferred_search_index(using='default'):
+    """Массовая загрузка постов: индекс не обновляется на каждую
+    вставку, а перестраивается один раз в конце.
+    """
+    if not has_search_index(using):
+        yield
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {INSERT_TRIGGER}')
+    try:
+        yield
+    finally:
+        install_search_triggers(using)
+        rebuild_search_index(using)
+
+
+def match_expression(query):
+    """Запрос пользователя в синтаксисе FTS5: каждое слово — префикс,
+    все слова обязательны. Спецсимволы FTS5 до индекса не доходят.
+    """
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def filter_posts(posts, query):
+    """Оставляет посты, текст которых подходит под запрос."""
+    expression = match_expression(query)
+    if not expression:
+        return posts.none()
+    if connections[posts.db].vendor != 'sqlite':
+        for word in re.findall(r'\w+', query):
+            posts = posts.filter(text__icontains=word)
+        return posts
+    # Не filter(id__in=RawSQL(...)): SQLite прочитает IN ((SELECT ...))
+    # как скалярный подзапрос и вернёт только первую строку.
+    return posts.extra(
+        where=[
+            f'posts_post.id IN (SELECT rowid FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s)'
+        ],
+        params=[expression],
+    )
+
+
+def search_posts(posts, query):
+    """Посты, подходящие под запрос, от самых релевантных (bm25)."""
+    expression = match_expression(query)
+    if not expression:
+        return posts.none()
+    if connections[posts.db].vendor != 'sqlite':
+        return filter_posts(posts, query)
+    return posts.extra(
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE}.rowid = posts_post.id',
+            f'{SEARCH_TABLE} MATCH %s',
+        ],
+        params=[expression],
+        select={'search_rank': f'{SEARCH_TABLE}.rank'},
+        order_by=['search_rank', '-pub_date'],
+    )
@@ -0,0 +1,156 @@
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from .cache import author_scope, bump, feed_scopes, group_scope
+from .lookups import LOOKUPS, forget_group_choices
+from .models import Group, Post, PostCounter, User
+from .thumbnails import delete_thumbnails, schedule_thumbnails
+
+TRACKED_FIELDS = ('author_id', 'group_id', 'image')
+# Поля пользователя, которые выводятся на страницах с постами.
+DISPLAYED_USER_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(pre_save, sender=Post)
+def remember_loaded_values(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_values', {})
+    if instance.pk is None or all(name in loaded for name in TRACKED_FIELDS):
+        return
+    instance._loaded_values = Post.objects.filter(pk=instance.pk).values(
+        *TRACKED_FIELDS
+    ).first() or {}
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    previous_author_id = getattr(instance, '_loaded_values', {}).get(
+        'author_id'
+    )
+    if created:
+        PostCounter.objects.add(instance.author_id, 1)
+    elif previous_author_id not in (None, instance.author_id):
+        PostCounter.objects.add(previous_author_id, -1)
+        PostCounter.objects.add(instance.author_id, 1)
+
+
+@receiver(post_save, sender=Post)
+def pregenerate_thumbnails(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_values', {})
+    if instance.image and loaded.get('image') != instance.image.name:
+        # Только id: области лент найдёт уже generate_thumbnails.
+        schedule_thumbnails(
+            instance.image.name, instance.author_id, instance.group_id
+        )
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post_pages(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_values', {})
+    # Текущие автор и группа обычно уже загружены вместе с постом,
+    # запросы нужны только для прежних значений.
+    pages = feed_scopes(
+        {loaded.get('author_id')} - {instance.author_id},
+        {loaded.get('group_id')} - {instance.group_id},
+    )
+    pages.append(author_scope(instance.author.username))
+    if instance.group_id is not None:
+        pages.append(group_scope(instance.group.slug))
+    bump(pages)
+    instance._loaded_values = {
+        name: getattr(instance, name) for name in TRACKED_FIELDS
+    }
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    PostCounter.objects.add(instance.author_id, -1)
+    bump(feed_scopes({instance.author_id}, {instance.group_id}))
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_thumbnails(sender, instance, **kwargs):
+    if instance.image:
+        delete_thumbnails([instance.image.name])
+
+
+def group_pages(group):
+    authors = Post.objects.filter(group=group).order_by().values_list(
+        'author_id', flat=True
+    ).distinct()
+    return feed_scopes(authors) + [group_scope(group.slug)]
+
+
+@receiver(pre_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def remember_group_pages(sender, instance, **kwargs):
+    if instance.pk is not None:
+        previous = Group.objects.filter(pk=instance.pk).first()
+        instance._previous_pages = group_pages(previous) if previous else []
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_pages(sender, instance, **kwargs):
+    pages = getattr(instance, '_previous_pages', [])
+    if not kwargs.get('created'):
+        pages = pages + [group_scope(instance.slug)]
+    bump(pages)
+
+
+def user_pages(user):
+    groups = list(
+        Post.objects.filter(author=user).order_by().values_list(
+            'group_id', flat=True
+        ).distinct()
+    )
+    pages = [author_scope(user.username)]
+    if groups:
+        pages.extend(feed_scopes(group_ids=groups))
+    return pages
+
+
+def affects_pages(update_fields):
+    return update_fields is None or DISPLAYED_USER_FIELDS & set(update_fields)
+
+
+@receiver(pre_save, sender=User)
+def remember_user_pages(sender, instance, update_fields, **kwargs):
+    if instance.pk is None or not affects_pages(update_fields):
+        return
+    previous = User.objects.filter(pk=instance.pk).first()
+    instance._previous_pages = user_pages(previous) if previous else []
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_pages(sender, instance, created, update_fields, **kwargs):
+    if not created and affects_pages(update_fields):
+        bump(getattr(instance, '_previous_pages', []) + user_pages(instance))
+
+
+@receiver(pre_save, sender=Group)
+@receiver(pre_save, sender=User)
+def remember_lookup_value(sender, instance, update_fields, **kwargs):
+    lookup = LOOKUPS[sender]
+    if instance.pk is None or (
+        update_fields is not None and lookup.field not in update_fields
+    ):
+        return
+    instance._previous_lookup_value = sender.objects.filter(
+        pk=instance.pk
+    ).values_list(lookup.field, flat=True).first()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=User)
+def forget_lookup_value(sender, instance, **kwargs):
+    lookup = LOOKUPS[sender]
+    lookup.forget(
+        getattr(instance, lookup.field),
+        getattr(instance, '_previous_lookup_value', None),
+    )
+    if sender is Group:
+        forget_group_choices()
@@ -0,0 +1,11 @@
+from django import template
+
+from ..cards import render_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(page, show_group=True):
+    """Список HTML карточек постов страницы из кеша карточек."""
+    return render_cards(page, show_group)
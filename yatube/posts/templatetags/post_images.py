@@ -0,0 +1,15 @@
+from django import template
+
+from ..thumbnails import ready_thumbnail
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_thumbnail(image, size):
+    """Готовая миниатюра картинки поста или None, пока пул
+    её не создал.
+    """
+    if not image:
+        return None
+    return ready_thumbnail(image.name, size)
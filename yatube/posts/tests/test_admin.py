@@ -0,0 +1,145 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..admin import NO_GROUP
+from ..models import Group, Post, PostCounter
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='password'
+        )
+        cls.user = User.objects.create_user(username='auth')
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {n}', slug=f'group-{n}', description=''
+            )
+            for n in range(5)
+        ]
+        cls.changelist_url = reverse('admin:posts_post_changelist')
+
+    def setUp(self):
+        cache.clear()
+        Post.objects.bulk_create(
+            Post(
+                text=f'Пост #{n}', author=self.user,
+                group=self.groups[n % len(self.groups)],
+            )
+            for n in range(30)
+        )
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.admin_client.get(self.changelist_url)
+        self.assertContains(response, 'Пост #0')
+        return [query['sql'] for query in queries.captured_queries]
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Список постов не делает запросов на каждую строку
+        и не считает таблицу повторно
+        """
+        self.changelist_queries()
+        queries = self.changelist_queries()
+        self.assertFalse([sql for sql in queries if 'COUNT(' in sql])
+        self.assertFalse([
+            sql for sql in queries
+            if sql.startswith('SELECT') and 'FROM "posts_group"' in sql
+        ])
+        self.assertLess(len(queries), 10)
+
+    def run_action(self, action, posts, **data):
+        return self.admin_client.post(self.changelist_url, {
+            'action': action,
+            '_selected_action': [post.pk for post in posts],
+            **data,
+        })
+
+    def test_move_to_group_action(self):
+        """Перенос в группу выполняется одним UPDATE"""
+        posts = list(Post.objects.filter(group=self.groups[0]))
+        target = self.groups[1]
+        with CaptureQueriesContext(connection) as queries:
+            self.run_action('move_to_group', posts, group=target.pk)
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "posts_post"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(
+            Post.objects.filter(group=self.groups[0]).exists()
+        )
+        self.assertEqual(Post.objects.filter(group=target).count(), 12)
+
+    def test_move_to_group_keeps_edit_date(self):
+        """Перенос в группу не выглядит как правка поста"""
+        post = Post.objects.filter(group=self.groups[0]).first()
+        self.run_action('move_to_group', [post], group=self.groups[1].pk)
+        moved = Post.objects.get(pk=post.pk)
+        self.assertEqual(moved.group, self.groups[1])
+        self.assertEqual(moved.edit_date, post.edit_date)
+
+    def test_move_to_group_needs_explicit_choice(self):
+        """Без выбранной группы посты не трогаются, «Без группы»
+        снимает группу явно
+        """
+        posts = list(Post.objects.filter(group=self.groups[0]))
+        self.run_action('move_to_group', posts, group='')
+        self.assertEqual(
+            Post.objects.filter(group=self.groups[0]).count(), 6
+        )
+        self.run_action('move_to_group', posts, group=NO_GROUP)
+        self.assertFalse(
+            Post.objects.filter(group=self.groups[0]).exists()
+        )
+        self.assertEqual(Post.objects.filter(group=None).count(), 6)
+
+    def test_delete_posts_asks_for_confirmation(self):
+        """Первый шаг удаления показывает подтверждение и ничего
+        не удаляет
+        """
+        posts = list(Post.objects.filter(group=self.groups[0]))
+        response = self.run_action('delete_posts', posts)
+        self.assertTemplateUsed(
+            response, 'admin/posts/post/delete_posts_confirmation.html'
+        )
+        self.assertContains(response, 'Будет удалено постов: 6')
+        self.assertEqual(Post.objects.count(), 30)
+
+    def test_delete_all_filtered_asks_for_confirmation(self):
+        """«Выбрать все» тоже проходит через подтверждение"""
+        response = self.run_action(
+            'delete_posts', Post.objects.all()[:1], select_across='1'
+        )
+        self.assertContains(response, 'Будет удалено постов: 30')
+        self.assertEqual(Post.objects.count(), 30)
+        self.run_action(
+            'delete_posts', Post.objects.all()[:1],
+            select_across='1', post='yes',
+        )
+        self.assertFalse(Post.objects.exists())
+
+    def test_delete_posts_action(self):
+        """Удаление идёт одним DELETE и обновляет счётчик автора"""
+        posts = list(Post.objects.filter(group=self.groups[0]))
+        with CaptureQueriesContext(connection) as queries:
+            self.run_action('delete_posts', posts, post='yes')
+        deletes = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('DELETE FROM "posts_post"')
+        ]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(Post.objects.count(), 24)
+        self.assertEqual(
+            PostCounter.objects.get(author=self.user).posts_count, 24
+        )
@@ -0,0 +1,332 @@
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from ..cache import FEED_SCOPE, get_generations
+from ..models import Post, Group
+
+User = get_user_model()
+
+
+class PostPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.another_group = Group.objects.create(
+            title='Другая группа',
+            slug='another-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group
+        )
+        cls.index_url = reverse('posts:index')
+        cls.group_url = reverse(
+            'posts:group_list', kwargs={'slug': cls.group.slug}
+        )
+        cls.another_group_url = reverse(
+            'posts:group_list', kwargs={'slug': cls.another_group.slug}
+        )
+        cls.profile_url = reverse(
+            'posts:profile', kwargs={'username': cls.user.username}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def assert_cached(self, address):
+        with self.assertNumQueries(0):
+            self.guest_client.get(address)
+
+    def test_anonymous_pages_are_cached(self):
+        """Повторный запрос анонима отдаётся из кеша без SQL"""
+        for address in (self.index_url, self.group_url, self.profile_url):
+            with self.subTest(address=address):
+                content = self.guest_client.get(address).content
+                self.assert_cached(address)
+                self.assertEqual(
+                    self.guest_client.get(address).content, content
+                )
+
+    def test_new_post_bumps_only_affected_pages(self):
+        """Новый пост сбрасывает только свои ленты"""
+        for address in (self.index_url, self.group_url,
+                        self.another_group_url, self.profile_url):
+            self.guest_client.get(address)
+        Post.objects.create(
+            author=self.user, text='Новый пост', group=self.group
+        )
+        self.assert_cached(self.another_group_url)
+        for address in (self.index_url, self.group_url, self.profile_url):
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+                self.assertIn('Новый пост', response.content.decode())
+
+    def test_group_reassignment_bumps_both_groups(self):
+        """Перенос поста в другую группу сбрасывает обе группы"""
+        self.guest_client.get(self.group_url)
+        self.guest_client.get(self.another_group_url)
+        Post.objects.filter(pk=self.post.pk).update(group=self.another_group)
+        self.assertNotIn(
+            self.post.text,
+            self.guest_client.get(self.group_url).content.decode()
+        )
+        self.assertIn(
+            self.post.text,
+            self.guest_client.get(self.another_group_url).content.decode()
+        )
+
+    def test_author_rename_bumps_author_pages(self):
+        """Смена имени автора сбрасывает ленты с его постами"""
+        self.guest_client.get(self.group_url)
+        self.guest_client.get(self.another_group_url)
+        self.user.first_name = 'Лев'
+        self.user.save()
+        self.assertIn('Лев', self.guest_client.get(
+            self.group_url).content.decode())
+        self.assert_cached(self.another_group_url)
+
+    def test_authorized_pages_share_cache_with_own_header(self):
+        """Авторизованный пользователь получает страницу из общего кеша
+        со своей шапкой
+        """
+        guest_content = self.guest_client.get(self.index_url).content
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        response = authorized_client.get(self.index_url)
+        self.assertTemplateNotUsed(response, 'posts/index.html')
+        self.assertContains(response, 'Пользователь: auth')
+        self.assertNotIn('Пользователь: auth'.encode(), guest_content)
+        self.assertIn(self.post.text.encode(), response.content)
+
+    def test_admin_list_editable_bumps_groups(self):
+        """Смена группы через list_editable в админке сбрасывает ленты"""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='password'
+        )
+        admin_client = Client()
+        admin_client.force_login(admin)
+        self.guest_client.get(self.another_group_url)
+        response = admin_client.post(
+            reverse('admin:posts_post_changelist'),
+            {
+                'form-TOTAL_FORMS': 1,
+                'form-INITIAL_FORMS': 1,
+                'form-0-id': self.post.pk,
+                'form-0-group': self.another_group.pk,
+                '_save': 'Сохранить',
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(
+            self.post.text,
+            self.guest_client.get(self.another_group_url).content.decode()
+        )
+
+
+class PostConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group
+        )
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.addresses = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+        )
+
+    def test_unchanged_pages_answer_not_modified(self):
+        """Неизменённая страница отвечает 304 по ETag и Last-Modified"""
+        for address in self.addresses:
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                response = self.guest_client.get(
+                    address, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+                response = self.guest_client.get(
+                    address,
+                    HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+
+    def test_not_modified_feed_skips_database(self):
+        """304 для ленты отдаётся без запросов к базе"""
+        address = reverse('posts:index')
+        etag = self.guest_client.get(address)['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(
+                address, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_edit_and_delete_change_validators(self):
+        """Правка и удаление поста меняют ETag и Last-Modified"""
+        etags = {
+            address: self.guest_client.get(address)['ETag']
+            for address in self.addresses
+        }
+        edit_date = self.post.edit_date
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            {'text': 'Изменённый пост', 'group': self.group.pk},
+        )
+        self.post.refresh_from_db()
+        self.assertGreater(self.post.edit_date, edit_date)
+        for address in self.addresses:
+            with self.subTest(address=address):
+                response = self.guest_client.get(
+                    address, HTTP_IF_NONE_MATCH=etags[address]
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+        index_etag = self.guest_client.get(self.addresses[0])['ETag']
+        self.post.delete()
+        response = self.guest_client.get(
+            self.addresses[0], HTTP_IF_NONE_MATCH=index_etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_delete_and_rename_move_last_modified(self):
+        """Удаление поста и переименование группы сдвигают
+        Last-Modified ленты, а не только ETag
+        """
+        def rename_group():
+            self.group.title = 'Новое название'
+            self.group.save()
+
+        group_url = self.addresses[1]
+        for change in (self.post.delete, rename_group):
+            last_modified = self.guest_client.get(group_url)['Last-Modified']
+            change()
+            response = self.guest_client.get(
+                group_url, HTTP_IF_MODIFIED_SINCE=last_modified
+            )
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_rename_moves_post_last_modified(self):
+        """Переименование группы сдвигает Last-Modified страницы поста"""
+        post_url = self.addresses[3]
+        last_modified = self.guest_client.get(post_url)['Last-Modified']
+        self.group.title = 'Новое название'
+        self.group.save()
+        response = self.guest_client.get(
+            post_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+@override_settings(POSTS_PAGE_CACHE=False)
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group
+        )
+        self.guest_client = Client()
+        self.index_url = reverse('posts:index')
+        self.profile_url = reverse(
+            'posts:profile', kwargs={'username': self.user.username}
+        )
+
+    def test_cards_are_shared_between_listings(self):
+        """Карточка, нарисованная для главной, используется в профиле"""
+        response = self.guest_client.get(self.index_url)
+        self.assertTemplateUsed(response, 'posts/includes/post_card.html')
+        response = self.guest_client.get(self.profile_url)
+        self.assertTemplateNotUsed(
+            response, 'posts/includes/post_card.html'
+        )
+        self.assertContains(response, self.post.text)
+
+    def test_edits_and_renames_replace_cards(self):
+        """Правка поста, смена имени автора и группы дают новую карточку"""
+        self.guest_client.get(self.index_url)
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            {'text': 'Изменённый пост', 'group': self.group.pk},
+        )
+        self.assertContains(
+            self.guest_client.get(self.index_url), 'Изменённый пост'
+        )
+        self.user.first_name = 'Лев'
+        self.user.save()
+        self.assertContains(self.guest_client.get(self.index_url), 'Лев')
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertContains(
+            self.guest_client.get(self.index_url), 'Новое название'
+        )
+
+    def test_rerendered_text_replaces_card(self):
+        """Новый HTML текста от render_post_texts даёт новую карточку"""
+        self.guest_client.get(self.index_url)
+        with mock.patch(
+            'posts.management.commands.render_post_texts.render_text',
+            return_value='<p>Новый HTML</p>',
+        ):
+            call_command('render_post_texts', all=True, stdout=StringIO())
+        self.assertContains(
+            self.guest_client.get(self.index_url), 'Новый HTML'
+        )
+
+
+class PostCacheCommitTests(TransactionTestCase):
+    def test_generation_changes_again_after_commit(self):
+        """Страница, закешированная до коммита записи,
+        после коммита не читается
+        """
+        cache.clear()
+        user = User.objects.create_user(username='auth')
+        before = get_generations([FEED_SCOPE])
+        with transaction.atomic():
+            Post.objects.create(author=user, text='Пост')
+            during = get_generations([FEED_SCOPE])
+            self.assertNotEqual(during, before)
+        self.assertNotEqual(get_generations([FEED_SCOPE]), during)
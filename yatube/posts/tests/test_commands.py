@@ -0,0 +1,156 @@
+import json
+import os
+import tempfile
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Group, ImportCheckpoint, Post, PostCounter
+from ..search import filter_posts
+
+User = get_user_model()
+
+
+class ImportPostsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as source:
+            source.write(content)
+        return path
+
+    def test_import_jsonl_keeps_pub_date(self):
+        """Импорт JSONL сохраняет исходные даты и пропускает чужих авторов"""
+        rows = [
+            {'text': 'Старый пост', 'author': 'auth', 'group': 'test-slug',
+             'pub_date': '2015-03-01T10:00:00+00:00'},
+            {'text': 'Без даты', 'author': 'auth'},
+            {'text': 'Чужой пост', 'author': 'nobody'},
+        ]
+        path = self.write(
+            'posts.jsonl', '\n'.join(json.dumps(row) for row in rows)
+        )
+        call_command('import_posts', path, batch_size=2, stdout=StringIO())
+        post = Post.objects.get(text='Старый пост')
+        expected = timezone.make_aware(datetime(2015, 3, 1, 10), timezone.utc)
+        self.assertEqual(post.pub_date, expected)
+        self.assertEqual(post.edit_date, expected)
+        self.assertEqual(post.group, self.group)
+        self.assertTrue(Post.objects.filter(text='Без даты').exists())
+        self.assertFalse(Post.objects.filter(text='Чужой пост').exists())
+        self.assertEqual(
+            PostCounter.objects.get(author=self.user).posts_count, 2
+        )
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
+
+    def test_import_csv_resumes_from_checkpoint(self):
+        """Импорт CSV продолжается с контрольной точки"""
+        path = self.write(
+            'posts.csv',
+            'text,author,group,pub_date\n'
+            'Первый,auth,,2020-01-01T00:00:00\n'
+            'Второй,auth,test-slug,2020-01-02T00:00:00\n'
+            'Третий,newbie,new-group,2020-01-03T00:00:00\n'
+        )
+        ImportCheckpoint.objects.create(name='archive', position=1)
+        call_command(
+            'import_posts', path, checkpoint='archive',
+            create_missing=True, stdout=StringIO()
+        )
+        self.assertEqual(
+            list(Post.objects.order_by('pub_date').values_list(
+                'text', flat=True
+            )),
+            ['Второй', 'Третий']
+        )
+        self.assertTrue(Group.objects.filter(slug='new-group').exists())
+        self.assertEqual(
+            ImportCheckpoint.objects.get(name='archive').position, 3
+        )
+
+    def test_malformed_lines_are_skipped(self):
+        """Битая строка JSONL и строка не-объект пропускаются,
+        остальные посты импортируются
+        """
+        path = self.write(
+            'posts.jsonl',
+            '{"text": "Первый", "author": "auth"}\n'
+            '{"text": оборвано\n'
+            '["не", "объект"]\n'
+            '{"text": "Второй", "author": "auth"}\n'
+        )
+        stdout = StringIO()
+        call_command(
+            'import_posts', path, checkpoint='archive', stdout=stdout
+        )
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertIn('пропущено строк: 2', stdout.getvalue())
+        self.assertEqual(
+            ImportCheckpoint.objects.get(name='archive').position, 4
+        )
+
+
+class SeedDataCommandTests(TestCase):
+    def seed(self, **options):
+        call_command(
+            'seed_data', users=5, groups=3, posts=120, batch_size=50,
+            days=30, stdout=StringIO(), **options
+        )
+
+    def test_seed_data_is_skewed_and_spread(self):
+        """Генератор создаёт данные с перекосом и датами за период"""
+        self.seed(workers=2)
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 120)
+        counts = sorted(
+            PostCounter.objects.values_list('posts_count', flat=True),
+            reverse=True
+        )
+        self.assertEqual(sum(counts), 120)
+        self.assertGreater(counts[0], counts[-1])
+        self.assertTrue(Post.objects.filter(group=None).exists())
+        post = Post.objects.last()
+        self.assertIn(
+            post, filter_posts(Post.objects.all(), post.text.split()[0])
+        )
+        oldest = Post.objects.order_by('pub_date').first().pub_date
+        self.assertLess(oldest, timezone.now() - timezone.timedelta(days=20))
+        self.assertEqual(
+            list(Post.objects.order_by('id').values_list('id', flat=True)),
+            list(Post.objects.order_by('pub_date').values_list(
+                'id', flat=True
+            ))
+        )
+
+    def test_seed_is_reproducible(self):
+        """С одинаковым seed тексты постов совпадают"""
+        self.seed(workers=1)
+        texts = list(Post.objects.order_by('id').values_list(
+            'text', flat=True
+        ))
+        Post.objects.all().delete()
+        self.seed(workers=2)
+        self.assertEqual(
+            list(Post.objects.order_by('id').values_list('text', flat=True)),
+            texts
+        )
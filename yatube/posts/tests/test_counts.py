@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..counts import cached_count, estimated_count
+from ..models import Post, Group
+
+User = get_user_model()
+
+
+@override_settings(POSTS_PAGE_CACHE=False)
+class PostCountStrategiesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый пост #{n}', author=cls.user, group=cls.group)
+            for n in range(15)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def count_queries(self, address):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(address, {'page': 2})
+        counts = [
+            query for query in queries.captured_queries
+            if 'COUNT(' in query['sql']
+        ]
+        return len(counts), response.context['page_obj'].paginator.count
+
+    def test_cached_count_follows_writes(self):
+        """Число постов берётся из кеша до новой записи в ленту"""
+        for address in (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+        ):
+            with self.subTest(address=address):
+                self.assertEqual(self.count_queries(address)[0], 1)
+                self.assertEqual(self.count_queries(address), (0, 15))
+                post = Post.objects.create(
+                    text='Новый пост', author=self.user, group=self.group
+                )
+                self.assertEqual(self.count_queries(address), (1, 16))
+                post.delete()
+
+    def test_profile_total_comes_from_counter(self):
+        """Профиль берёт число постов из счётчика автора, без COUNT(*)"""
+        address = reverse(
+            'posts:profile', kwargs={'username': self.user.username}
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(address)
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if 'COUNT(' in query['sql']
+        ])
+        self.assertContains(response, 'Всего постов: 15')
+
+    @override_settings(POSTS_INDEX_COUNT_STRATEGY='exact')
+    def test_exact_count_strategy(self):
+        """Стратегия exact считает посты на каждый запрос"""
+        address = reverse('posts:index')
+        self.count_queries(address)
+        self.assertEqual(self.count_queries(address), (1, 15))
+
+    def test_estimated_count_uses_table_statistics(self):
+        """Оценка берётся из статистики таблицы, без неё — из кеша"""
+        posts = Post.objects.all()
+        self.assertEqual(estimated_count(posts), 15)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        Post.objects.create(text='Новый пост', author=self.user)
+        with self.assertNumQueries(2):
+            self.assertEqual(estimated_count(posts), 15)
+        filtered = posts.filter(group=self.group)
+        self.assertEqual(
+            estimated_count(filtered), cached_count(filtered)
+        )
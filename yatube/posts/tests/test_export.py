@@ -0,0 +1,143 @@
+import csv
+import json
+import os
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from ..export import iter_posts
+from ..models import Post, Group
+
+User = get_user_model()
+
+
+@override_settings(POSTS_EXPORT_CHUNK_SIZE=2)
+class PostExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for n in range(5):
+            Post.objects.create(
+                text=f'Тестовый пост #{n}', author=cls.user,
+                group=cls.group if n % 2 else None,
+            )
+        Post.objects.create(text='Чужой пост', author=cls.other)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.other)
+
+    def get_lines(self, address, client=None):
+        response = (client or self.authorized_client).get(address)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_profile_export_jsonl(self):
+        """Выгрузка автора в JSONL содержит только его посты"""
+        lines = self.get_lines(reverse(
+            'posts:profile_export',
+            kwargs={'username': 'auth', 'file_format': 'jsonl'}
+        ))
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [row['text'] for row in rows],
+            [f'Тестовый пост #{n}' for n in range(5)]
+        )
+        self.assertEqual(rows[1]['group'], 'test-slug')
+        self.assertEqual(rows[0]['group'], '')
+
+    def test_group_export_csv(self):
+        """Выгрузка группы в CSV начинается с заголовка"""
+        lines = self.get_lines(reverse(
+            'posts:group_export',
+            kwargs={'slug': 'test-slug', 'file_format': 'csv'}
+        ))
+        rows = list(csv.DictReader(lines))
+        self.assertEqual(
+            [row['text'] for row in rows],
+            ['Тестовый пост #1', 'Тестовый пост #3']
+        )
+        self.assertEqual(rows[0]['author'], 'auth')
+
+    def test_site_export_is_for_staff(self):
+        """Полная выгрузка доступна только персоналу"""
+        address = reverse('posts:posts_export', kwargs={'file_format': 'csv'})
+        response = self.guest_client.get(address)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        staff_client = Client()
+        staff_client.force_login(self.staff)
+        self.assertEqual(len(self.get_lines(address, staff_client)), 7)
+
+    def test_feed_exports_require_login(self):
+        """Выгрузка автора и группы недоступна анониму"""
+        addresses = (
+            reverse(
+                'posts:profile_export',
+                kwargs={'username': 'auth', 'file_format': 'csv'}
+            ),
+            reverse(
+                'posts:group_export',
+                kwargs={'slug': 'test-slug', 'file_format': 'csv'}
+            ),
+        )
+        for address in addresses:
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+                self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    @override_settings(POSTS_EXPORT_MAX_ROWS=3)
+    def test_feed_export_is_capped(self):
+        """Выгрузка автора отдаёт не больше POSTS_EXPORT_MAX_ROWS постов"""
+        lines = self.get_lines(reverse(
+            'posts:profile_export',
+            kwargs={'username': 'auth', 'file_format': 'jsonl'}
+        ))
+        self.assertEqual(len(lines), 3)
+
+    def test_unknown_format_is_not_found(self):
+        """Неизвестный формат выгрузки отвечает 404"""
+        response = self.authorized_client.get(reverse(
+            'posts:profile_export',
+            kwargs={'username': 'auth', 'file_format': 'xml'}
+        ))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_iter_posts_reads_in_chunks(self):
+        """Посты читаются пачками, по запросу на пачку"""
+        with self.assertNumQueries(4):
+            self.assertEqual(len(list(iter_posts(Post.objects.all()))), 6)
+
+    def test_export_command_round_trip(self):
+        """Выгрузка команды export_posts загружается import_posts"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'posts.csv')
+            call_command(
+                'export_posts', format='csv', author='auth', output=path,
+                stderr=StringIO()
+            )
+            exported = list(Post.objects.filter(author=self.user).values_list(
+                'text', 'group_id', 'pub_date'
+            ).order_by('id'))
+            Post.objects.filter(author=self.user).delete()
+            call_command('import_posts', path, stdout=StringIO())
+        self.assertEqual(
+            list(Post.objects.filter(author=self.user).values_list(
+                'text', 'group_id', 'pub_date'
+            ).order_by('id')),
+            exported
+        )
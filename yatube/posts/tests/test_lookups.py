@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..lookups import group_by_slug, user_by_username
+from ..models import Group
+
+User = get_user_model()
+
+
+class LookupCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for lookup in (group_by_slug, user_by_username):
+            lookup.local.clear()
+
+    def test_hits_and_misses_skip_database(self):
+        """Повторный поиск объекта и отсутствующего ключа идёт без SQL"""
+        user = User.objects.create_user(username='auth')
+        self.assertEqual(user_by_username.get('auth'), user)
+        self.assertIsNone(group_by_slug.get('nope'))
+        with self.assertNumQueries(0):
+            self.assertEqual(user_by_username.get('auth'), user)
+            self.assertIsNone(group_by_slug.get('nope'))
+        group_by_slug.local.clear()
+        with self.assertNumQueries(0):
+            self.assertIsNone(group_by_slug.get('nope'))
+
+    def test_saves_and_deletes_invalidate(self):
+        """Создание, смена slug и удаление группы сбрасывают кеш"""
+        self.assertIsNone(group_by_slug.get('test-slug'))
+        group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description=''
+        )
+        self.assertEqual(group_by_slug.get('test-slug'), group)
+        group.slug = 'new-slug'
+        group.save()
+        self.assertIsNone(group_by_slug.get('test-slug'))
+        self.assertEqual(group_by_slug.get('new-slug').slug, 'new-slug')
+        group.delete()
+        self.assertIsNone(group_by_slug.get('new-slug'))
+
+    def test_cached_pages_ignore_local_copies(self):
+        """Кешируемая страница группы не берёт объект из LRU, который
+        мог устареть в другом процессе
+        """
+        group = Group.objects.create(
+            title='Группа', slug='test-slug', description='Старое'
+        )
+        stale = group_by_slug.get('test-slug')
+        group.description = 'Новое'
+        group.save()
+        # Так выглядит LRU процесса, который не видел сохранения.
+        group_by_slug.set_local('test-slug', (stale,))
+        response = self.client.get(
+            reverse('posts:group_list', args=('test-slug',))
+        )
+        self.assertContains(response, 'Новое')
+
+    def test_keys_are_safe_for_memcached(self):
+        """Ключ кеша не зависит от длины и алфавита значения"""
+        for value in ('auth', 'Тестовый слаг', 'x' * 500):
+            with self.subTest(value=value[:20]):
+                key = user_by_username.key(value)
+                self.assertTrue(key.isascii())
+                self.assertLess(len(key), 100)
+                self.assertNotIn(' ', key)
+
+    @override_settings(LOOKUP_CACHE_SIZE=2)
+    def test_local_cache_is_bounded(self):
+        """LRU в процессе не растёт больше LOOKUP_CACHE_SIZE"""
+        for slug in ('a', 'b', 'a', 'c'):
+            group_by_slug.get(slug)
+        self.assertEqual(list(group_by_slug.local), ['a', 'c'])
@@ -1,7 +1,11 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 
-from ..models import Group, Post
+from ..models import Group, Post, PostCounter
 
 User = get_user_model()
 
@@ -53,3 +57,122 @@ class PostModelTest(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     post._meta.get_field(field).help_text, expected_value)
+
+
+class PostCounterTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='auth')
+        self.another = User.objects.create_user(username='another')
+
+    def posts_count(self, user):
+        return PostCounter.objects.get(author=user).posts_count
+
+    def test_counter_follows_create_delete_and_reassignment(self):
+        """Счётчик меняется при создании, удалении и смене автора"""
+        post = Post.objects.create(author=self.author, text='Пост')
+        Post.objects.create(author=self.author, text='Ещё пост')
+        self.assertEqual(self.posts_count(self.author), 2)
+        post = Post.objects.get(pk=post.pk)
+        post.author = self.another
+        post.save()
+        self.assertEqual(self.posts_count(self.author), 1)
+        self.assertEqual(self.posts_count(self.another), 1)
+        post.delete()
+        self.assertEqual(self.posts_count(self.another), 0)
+
+    def test_counter_follows_bulk_operations(self):
+        """Счётчик учитывает bulk_create, update и delete набором"""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Пост #{n}') for n in range(5)
+        )
+        self.assertEqual(self.posts_count(self.author), 5)
+        Post.objects.filter(
+            pk__in=Post.objects.values('pk')[:2]
+        ).update(author=self.another)
+        self.assertEqual(self.posts_count(self.author), 3)
+        self.assertEqual(self.posts_count(self.another), 2)
+        Post.objects.filter(author=self.author).delete()
+        self.assertEqual(self.posts_count(self.author), 0)
+        another_pk = self.another.pk
+        self.another.delete()
+        self.assertFalse(
+            PostCounter.objects.filter(author_id=another_pk).exists()
+        )
+        self.assertEqual(PostCounter.objects.find_drift(), {})
+
+    def test_bulk_delete_in_batches(self):
+        """bulk_delete удаляет выборку пачками и пересчитывает счётчик"""
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Пост #{n}') for n in range(5)
+        )
+        self.assertEqual(Post.objects.all().bulk_delete(batch_size=2), 5)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(self.posts_count(self.author), 0)
+
+    def test_bulk_delete_has_nothing_to_cascade(self):
+        """_raw_delete в bulk_delete не каскадирует: внешний ключ
+        на Post потребует другого способа удаления
+        """
+        self.assertEqual(Post._meta.related_objects, ())
+
+    def test_counter_survives_drift(self):
+        """Удаление при нулевом счётчике не падает, а строка счётчика
+        появляется с первым постом автора
+        """
+        post = Post.objects.create(author=self.author, text='Пост')
+        PostCounter.objects.filter(author=self.author).update(posts_count=0)
+        post.delete()
+        self.assertEqual(self.posts_count(self.author), 0)
+        PostCounter.objects.filter(author=self.author).delete()
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(self.posts_count(self.author), 1)
+
+    def test_rebuild_command_fixes_drift(self):
+        """Команда rebuild_post_counters находит и исправляет расхождения"""
+        Post.objects.create(author=self.author, text='Пост')
+        PostCounter.objects.filter(author=self.author).update(posts_count=7)
+        with self.assertRaises(CommandError):
+            call_command(
+                'rebuild_post_counters', check=True, stdout=StringIO()
+            )
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assertEqual(self.posts_count(self.author), 1)
+        call_command('rebuild_post_counters', check=True, stdout=StringIO())
+
+
+class PostTextHtmlTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='auth')
+
+    def text_html(self, post):
+        return Post.objects.values_list('text_html', flat=True).get(
+            pk=post.pk
+        )
+
+    def test_text_html_follows_every_write(self):
+        """HTML текста пишется при save, bulk_create и update"""
+        post = Post.objects.create(
+            author=self.author, text='<b>Раз</b>\n\nДва'
+        )
+        self.assertEqual(
+            self.text_html(post), '<p>&lt;b&gt;Раз&lt;/b&gt;</p>\n\n<p>Два</p>'
+        )
+        post.text = 'Три'
+        post.save(update_fields=['text'])
+        self.assertEqual(self.text_html(post), '<p>Три</p>')
+        Post.objects.filter(pk=post.pk).update(text='Четыре')
+        self.assertEqual(self.text_html(post), '<p>Четыре</p>')
+        Post.objects.bulk_create([Post(author=self.author, text='Пять')])
+        self.assertEqual(
+            Post.objects.get(text='Пять').text_html, '<p>Пять</p>'
+        )
+
+    def test_render_command_fills_missing_html(self):
+        """Команда render_post_texts заполняет пустой HTML текста"""
+        post = Post.objects.create(author=self.author, text='Пост')
+        Post.objects.filter(pk=post.pk).update(text_html='')
+        self.assertEqual(
+            Post.objects.get(pk=post.pk).rendered_text, '<p>Пост</p>'
+        )
+        call_command('render_post_texts', stdout=StringIO())
+        self.assertEqual(self.text_html(post), '<p>Пост</p>')
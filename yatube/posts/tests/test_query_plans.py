@@ -0,0 +1,90 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Post, Group
+
+User = get_user_model()
+
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+TEMP_SORT = 'USE TEMP B-TREE'
+# Форма поста выводит список всех групп: полный проход здесь ожидаем.
+ALLOWED_FULL_SCANS = {'posts_group'}
+
+
+@override_settings(POSTS_PAGE_CACHE=False)
+class PostQueryPlanTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for n in range(25):
+            Post.objects.create(
+                text=f'Тестовый пост #{n}', author=cls.user, group=cls.group
+            )
+        cls.post = Post.objects.first()
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assert_plans_use_indexes(self, address):
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(address)
+        for query in queries.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            for step in self.explain(query['sql']):
+                with self.subTest(address=address, step=step):
+                    self.assertNotIn(TEMP_SORT, step, query['sql'])
+                    full_scan = FULL_SCAN.match(step)
+                    if full_scan:
+                        self.assertIn(
+                            full_scan.group(1), ALLOWED_FULL_SCANS,
+                            query['sql']
+                        )
+
+    def test_feed_queries_use_indexes(self):
+        """Запросы лент идут по индексам, без полного прохода и сортировки"""
+        feeds = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+        )
+        for address in feeds:
+            self.assert_plans_use_indexes(address)
+            self.assert_plans_use_indexes(address + '?page=2')
+            page = self.authorized_client.get(address).context['page_obj']
+            self.assert_plans_use_indexes(
+                f'{address}?cursor={page.next_cursor}'
+            )
+            next_page = self.authorized_client.get(
+                address, {'cursor': page.next_cursor}
+            ).context['page_obj']
+            self.assert_plans_use_indexes(
+                f'{address}?cursor={next_page.previous_cursor}'
+            )
+
+    def test_post_queries_use_indexes(self):
+        """Страницы поста, создания и редактирования идут по индексам"""
+        addresses = (
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            reverse('posts:post_create'),
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+        )
+        for address in addresses:
+            self.assert_plans_use_indexes(address)
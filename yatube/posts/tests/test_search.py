@@ -0,0 +1,86 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Post
+from ..search import filter_posts, search_posts
+
+User = get_user_model()
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='password'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Кошки любят рыбу. Кошки спят.'
+        )
+        cls.another_post = Post.objects.create(
+            author=cls.user, text='Собаки и кошки гуляют'
+        )
+        Post.objects.create(author=cls.user, text='Про погоду')
+
+    def found(self, query):
+        return list(
+            search_posts(Post.objects.all(), query)
+            .values_list('id', flat=True)
+        )
+
+    def test_search_is_ranked(self):
+        """Результаты отсортированы по релевантности"""
+        self.assertEqual(
+            self.found('кошки'), [self.post.id, self.another_post.id]
+        )
+        self.assertEqual(
+            filter_posts(Post.objects.all(), 'кошки').count(), 2
+        )
+        self.assertEqual(self.found('соба'), [self.another_post.id])
+        self.assertEqual(self.found('"; DROP'), [])
+        self.assertEqual(self.found(''), [])
+
+    def test_index_follows_edit_and_delete(self):
+        """Индекс обновляется при правке и удалении поста"""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Теперь про попугаев'
+        post.save()
+        self.assertEqual(self.found('попугаев'), [post.id])
+        self.assertEqual(self.found('рыбу'), [])
+        Post.objects.get(pk=self.another_post.pk).delete()
+        self.assertEqual(self.found('собаки'), [])
+
+    def test_search_page(self):
+        """Страница поиска выводит найденные посты"""
+        response = self.client.get(reverse('posts:search'), {'q': 'кошки'})
+        self.assertTemplateUsed(response, 'posts/search.html')
+        self.assertEqual(
+            [post.id for post in response.context['page_obj']],
+            [self.post.id, self.another_post.id]
+        )
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт через индекс, а не LIKE"""
+        admin_client = Client()
+        admin_client.force_login(self.admin)
+        response = admin_client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'собаки'}
+        )
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.another_post]
+        )
+        self.assertNotIn(
+            'LIKE', str(response.context['cl'].queryset.query)
+        )
+
+    def test_rebuild_command(self):
+        """Команда rebuild_search_index восстанавливает индекс"""
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.found('погоду'), [
+            Post.objects.get(text='Про погоду').id
+        ])
@@ -0,0 +1,140 @@
+import io
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, TransactionTestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from ..cards import render_cards
+from ..models import Post
+from ..thumbnails import has_thumbnails, ready_thumbnail
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def uploaded_gif(name='small.gif'):
+    return SimpleUploadedFile(name, SMALL_GIF, content_type='image/gif')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, POSTS_THUMBNAIL_WORKERS=0)
+class PostThumbnailTests(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        caches['default'].clear()
+        caches['thumbnails'].clear()
+        self.user = User.objects.create_user(username='auth')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_upload_pregenerates_thumbnails(self):
+        """После загрузки миниатюры готовы, и лента отдаёт их"""
+        self.client.post(
+            reverse('posts:post_create'),
+            {'text': 'С картинкой', 'image': uploaded_gif()},
+        )
+        post = Post.objects.get(text='С картинкой')
+        self.assertTrue(post.image.name.startswith('posts/'))
+        thumbnails = {
+            size: ready_thumbnail(post.image.name, size)
+            for size in settings.POSTS_THUMBNAIL_SIZES
+        }
+        self.assertTrue(all(thumbnails.values()))
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, thumbnails['list'].url)
+        self.assertNotContains(response, post.image.url)
+
+    def test_deleting_posts_removes_thumbnails(self):
+        """Удаление поста, в том числе bulk_delete из админки,
+        убирает файлы и записи его миниатюр
+        """
+        for delete in (
+            lambda post: post.delete(),
+            lambda post: Post.objects.filter(pk=post.pk).bulk_delete(),
+        ):
+            post = Post.objects.create(
+                author=self.user, text='Пост', image=uploaded_gif()
+            )
+            thumbnail = ready_thumbnail(post.image.name, 'list')
+            self.assertTrue(thumbnail.exists())
+            delete(post)
+            self.assertFalse(has_thumbnails(post.image.name))
+            self.assertFalse(thumbnail.exists())
+
+    def test_edit_with_new_image_fits_budget(self):
+        """Замена картинки укладывается в бюджет post_edit: миниатюры
+        создаются вне него
+        """
+        post = Post.objects.create(author=self.user, text='Пост')
+        self.client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            {'text': 'Пост', 'image': uploaded_gif('edit.gif')},
+        )
+        post.refresh_from_db()
+        self.assertTrue(has_thumbnails(post.image.name))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PostThumbnailFallbackTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_listing_does_not_generate_thumbnails(self):
+        """Пока миниатюр нет, лента показывает исходную картинку
+        и не создаёт их сама
+        """
+        caches['default'].clear()
+        user = User.objects.create_user(username='auth')
+        post = Post.objects.create(
+            author=user, text='Пост', image=uploaded_gif('fallback.gif')
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, post.image.url)
+        self.assertIsNone(ready_thumbnail(post.image.name, 'list'))
+
+    def test_missing_thumbnails_are_fetched_once_per_page(self):
+        """Отсутствие миниатюр всей страницы проверяется одним
+        запросом, а не запросом на каждую карточку
+        """
+        caches['default'].clear()
+        caches['thumbnails'].clear()
+        user = User.objects.create_user(username='auth')
+        for n in range(3):
+            Post.objects.create(
+                author=user, text=f'Пост #{n}',
+                image=uploaded_gif(f'page-{n}.gif'),
+            )
+        posts = list(Post.objects.feed())
+        with self.assertNumQueries(1):
+            render_cards(posts)
+
+    def test_command_generates_missing_thumbnails(self):
+        """Команда доделывает миниатюры, которые не создал пул"""
+        user = User.objects.create_user(username='auth')
+        post = Post.objects.create(
+            author=user, text='Пост', image=uploaded_gif('lost.gif')
+        )
+        self.assertFalse(has_thumbnails(post.image.name))
+        call_command('generate_thumbnails', stdout=io.StringIO())
+        self.assertTrue(has_thumbnails(post.image.name))
@@ -1,10 +1,19 @@
-from django.test import TestCase, Client
+from django.test import (
+    Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+)
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
 from django.urls import reverse
 from django import forms
 from http import HTTPStatus
 
+from core.query_budget import (
+    QueryBudgetExceeded, outside_budget, query_budget
+)
 from ..models import Post, Group
+from ..utils import ELLIPSIS, CursorPaginator, page_window
 
 User = get_user_model()
 
@@ -40,6 +49,7 @@ class PostsPagesTests(TestCase):
         }
 
     def setUp(self):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
@@ -154,6 +164,9 @@ class PostPaginatorsTests(TestCase):
             reverse('posts:profile', kwargs={'username': cls.user.username}),
         )
 
+    def setUp(self):
+        cache.clear()
+
     def test_first_pages_contains_ten_records(self):
         """Тестируем paginator на первых страницах"""
         for name in self.pages_names:
@@ -167,3 +180,179 @@ class PostPaginatorsTests(TestCase):
             with self.subTest(name=name):
                 response = self.client.get(name + '?page=2')
                 self.assertEqual(len(response.context['page_obj']), 3)
+
+
+class PostPageWindowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый пост #{n}', author=cls.user)
+            for n in range(40)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_window_is_bounded(self):
+        """Окно навигации не растёт с числом страниц"""
+        self.assertEqual(page_window(1, 3), [1, 2, 3])
+        self.assertEqual(
+            page_window(500, 10000),
+            [1, ELLIPSIS, 497, 498, 499, 500, 501, 502, 503, ELLIPSIS, 10000]
+        )
+        self.assertEqual(
+            page_window(5, 12),
+            [1, 2, 3, 4, 5, 6, 7, 8, ELLIPSIS, 12]
+        )
+
+    @override_settings(MAX_POSTS=1)
+    def test_paginator_renders_window(self):
+        """Навигация выводит окно вокруг текущей страницы"""
+        response = self.client.get(reverse('posts:index'), {'page': 20})
+        self.assertEqual(
+            response.context['page_obj'].page_window,
+            [1, ELLIPSIS, 17, 18, 19, 20, 21, 22, 23, ELLIPSIS, 40]
+        )
+        content = response.content.decode()
+        self.assertIn('page=40', content)
+        self.assertNotIn('page=10"', content)
+        self.assertEqual(content.count('…'), 2)
+
+
+class PostCursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            [
+                Post(text=f'Тестовый пост #{n}', author=cls.user)
+                for n in range(13)
+            ]
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages_follow_each_other(self):
+        """Курсоры next/prev переходят между страницами без пропусков"""
+        first_page = self.client.get(reverse('posts:index')).context[
+            'page_obj']
+        self.assertTrue(first_page.is_cursor)
+        self.assertFalse(first_page.has_previous())
+        second_page = self.client.get(
+            reverse('posts:index'), {'cursor': first_page.next_cursor}
+        ).context['page_obj']
+        self.assertEqual(len(second_page), 3)
+        self.assertFalse(second_page.has_next())
+        self.assertEqual(
+            {post.id for post in first_page}
+            | {post.id for post in second_page},
+            set(Post.objects.values_list('id', flat=True))
+        )
+        back_page = self.client.get(
+            reverse('posts:index'), {'cursor': second_page.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(
+            [post.id for post in back_page],
+            [post.id for post in first_page]
+        )
+
+    def test_cursor_page_skips_count(self):
+        """Страница по курсору не выполняет COUNT(*)"""
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        first_page = paginator.get_cursor_page(None)
+        with self.assertNumQueries(1):
+            paginator.get_cursor_page(first_page.next_cursor)
+
+    def test_broken_cursor_returns_first_page(self):
+        """Испорченный курсор приводит на первую страницу"""
+        response = self.client.get(reverse('posts:index'), {'cursor': 'xxx'})
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+
+class PostQueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for n in range(15):
+            Post.objects.create(
+                text=f'Тестовый пост #{n}',
+                author=User.objects.create_user(username=f'author-{n}'),
+                group=Group.objects.create(
+                    title=f'Группа #{n}',
+                    slug=f'group-{n}',
+                    description='Тестовое описание',
+                ),
+            )
+        cls.post = Post.objects.create(
+            text='Пост в общей группе', author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_views_fit_query_budget(self):
+        """Страницы укладываются в бюджет запросов при любом числе постов"""
+        addresses = (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'author-1'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            reverse('posts:post_create'),
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+        )
+        for address in addresses:
+            with self.subTest(address=address):
+                response = self.authorized_client.get(address)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_budget_overrun(self):
+        """Превышение бюджета — исключение или предупреждение в логе"""
+        @query_budget(0)
+        def view(request):
+            User.objects.count()
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        with self.assertRaises(QueryBudgetExceeded):
+            view(request)
+        with self.settings(QUERY_BUDGET_STRICT=False):
+            with self.assertLogs('core.query_budget', 'WARNING'):
+                view(request)
+
+    def test_outside_budget_is_not_counted(self):
+        """Запросы внутри outside_budget не входят в бюджет"""
+        @query_budget(0)
+        def view(request):
+            with outside_budget():
+                User.objects.count()
+            return HttpResponse()
+
+        view(RequestFactory().get('/'))
+
+
+class ReplicaQueryBudgetTests(SimpleTestCase):
+    databases = {'replica'}
+
+    def test_budget_counts_replica_queries(self):
+        """Запросы к реплике тоже входят в бюджет"""
+        @query_budget(0)
+        def view(request):
+            with connections['replica'].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return HttpResponse()
+
+        with self.assertRaises(QueryBudgetExceeded):
+            view(RequestFactory().get('/'))
@@ -0,0 +1,156 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+from sorl.thumbnail.models import KVStore
+
+from core.query_budget import outside_budget
+from .cache import bump, feed_scopes
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Общие параметры всех размеров: картинка обрезается по центру
+# и растягивается до размера миниатюры.
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+executor_lock = threading.Lock()
+executor = None
+
+
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=settings.POSTS_THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+        return executor
+
+
+def thumbnail_options(source):
+    """Параметры миниатюры так же, как их дополняет
+    ThumbnailBackend.get_thumbnail: от них зависит имя файла.
+    """
+    backend = default.backend
+    options = dict(THUMBNAIL_OPTIONS)
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    return options
+
+
+def thumbnail_file(name, size):
+    source = ImageFile(name, default.storage)
+    geometry = settings.POSTS_THUMBNAIL_SIZES[size]
+    thumbnail_name = default.backend._get_thumbnail_filename(
+        source, geometry, thumbnail_options(source)
+    )
+    return ImageFile(thumbnail_name, default.storage)
+
+
+def ready_thumbnail(name, size):
+    """Готовая миниатюра из хранилища ключей sorl или None.
+    В отличие от тега thumbnail, ничего не генерирует.
+    """
+    return default.kvstore.get(thumbnail_file(name, size))
+
+
+def prefetch_thumbnails(names, size):
+    """Кладёт в кеш sorl записи миниатюр всех картинок страницы одним
+    запросом к базе. Иначе каждая картинка, которой нет в кеше, стоит
+    ready_thumbnail отдельного запроса.
+    """
+    cache = default.kvstore.cache
+    keys = [add_prefix(thumbnail_file(name, size).key) for name in names]
+    missing = set(keys) - cache.get_many(keys).keys()
+    if not missing:
+        return
+    values = dict(
+        KVStore.objects.filter(key__in=missing).values_list('key', 'value')
+    )
+    # Отсутствие записи кешируется так же, как это делает сам sorl.
+    cache.set_many(
+        {key: values.get(key, EMPTY_VALUE) for key in missing},
+        sorl_settings.THUMBNAIL_CACHE_TIMEOUT,
+    )
+
+
+def has_thumbnails(name):
+    return all(
+        ready_thumbnail(name, size) for size in settings.POSTS_THUMBNAIL_SIZES
+    )
+
+
+def create_thumbnails(name):
+    for geometry in settings.POSTS_THUMBNAIL_SIZES.values():
+        get_thumbnail(name, geometry, **THUMBNAIL_OPTIONS)
+
+
+def generate_thumbnails(name, author_id, group_id):
+    """Создаёт миниатюры всех размеров и сбрасывает ленты, которые
+    до этого показывали исходную картинку.
+    """
+    with outside_budget():
+        create_thumbnails(name)
+        bump(feed_scopes({author_id}, {group_id}))
+
+
+def run_in_worker(*args):
+    try:
+        generate_thumbnails(*args)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры для %s', args[0])
+    finally:
+        connection.close()
+
+
+def schedule_thumbnails(name, author_id, group_id):
+    """После коммита отдаёт картинку пулу потоков; при
+    POSTS_THUMBNAIL_WORKERS = 0 миниатюры создаются сразу.
+
+    Очередь пула живёт только в памяти процесса: то, что не успело
+    создаться до перезапуска, доделывает generate_thumbnails.
+    """
+    def submit():
+        args = (name, author_id, group_id)
+        if settings.POSTS_THUMBNAIL_WORKERS:
+            get_executor().submit(run_in_worker, *args)
+        else:
+            generate_thumbnails(*args)
+
+    transaction.on_commit(submit)
+
+
+def delete_thumbnails(names):
+    """После коммита удаляет миниатюры картинок удалённых постов: файлы
+    и записи sorl. Исходные файлы остаются, как при обычном удалении
+    модели; картинки, на которые ещё ссылаются посты, не трогаются.
+    """
+    names = set(names) - {''}
+    if not names:
+        return
+
+    def delete():
+        with outside_budget():
+            used = set(Post.objects.filter(image__in=names).values_list(
+                'image', flat=True
+            ))
+            for name in names - used:
+                default.kvstore.delete(ImageFile(name, default.storage))
+
+    transaction.on_commit(delete)
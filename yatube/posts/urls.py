@@ -10,5 +10,21 @@ urlpatterns = [
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
-    path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit')
+    path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path('search/', views.search, name='search'),
+    path(
+        'profile/<str:username>/export/<str:file_format>/',
+        views.profile_export,
+        name='profile_export',
+    ),
+    path(
+        'group/<slug:slug>/export/<str:file_format>/',
+        views.group_export,
+        name='group_export',
+    ),
+    path(
+        'export/<str:file_format>/',
+        views.posts_export,
+        name='posts_export',
+    ),
 ]
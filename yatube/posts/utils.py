@@ -1,7 +1,189 @@
-from django.core.paginator import Paginator
+from django.core.paginator import Page, Paginator
 from django.conf import settings
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 
+from .counts import COUNT_STRATEGIES
 
-def pagination(request, posts):
-    paginator = Paginator(posts, settings.MAX_POSTS)
-    return paginator.get_page(request.GET.get('page'))
+CURSOR_NEXT = 'n'
+CURSOR_PREVIOUS = 'p'
+# Окно навигации: столько номеров вокруг текущей страницы и у краёв,
+# остальные сворачиваются в многоточие (ELLIPSIS в списке номеров).
+PAGE_WINDOW_EACH_SIDE = 3
+PAGE_WINDOW_ON_ENDS = 1
+ELLIPSIS = None
+
+
+def encode_cursor(post, direction):
+    """Непрозрачный токен позиции: направление и ключ (pub_date, id)."""
+    raw = f'{direction}|{post.pub_date.isoformat()}|{post.pk}'
+    return urlsafe_base64_encode(raw.encode())
+
+
+def decode_cursor(cursor):
+    """Разбирает токен; для пустого или испорченного возвращает None."""
+    if not cursor:
+        return None
+    try:
+        direction, pub_date, pk = (
+            urlsafe_base64_decode(cursor).decode().split('|')
+        )
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except ValueError:
+        return None
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+def page_window(number, num_pages, on_each_side=PAGE_WINDOW_EACH_SIDE,
+                on_ends=PAGE_WINDOW_ON_ENDS):
+    """Номера страниц для навигации: края, окно вокруг текущей
+    и ELLIPSIS на месте пропусков. Длина не зависит от num_pages.
+    """
+    window = range(
+        max(number - on_each_side, 1),
+        min(number + on_each_side, num_pages) + 1
+    )
+    head = range(1, min(on_ends, num_pages) + 1)
+    tail = range(max(num_pages - on_ends + 1, 1), num_pages + 1)
+    pages = []
+    for page in sorted({*head, *window, *tail}):
+        if pages and page == pages[-1] + 2:
+            # Многоточие вместо одной страницы ничего не экономит.
+            pages.append(page - 1)
+        elif pages and page > pages[-1] + 2:
+            pages.append(ELLIPSIS)
+        pages.append(page)
+    return pages
+
+
+class WindowedPage(Page):
+    @property
+    def page_window(self):
+        return page_window(self.number, self.paginator.num_pages)
+
+
+class WindowedPaginator(Paginator):
+    """Paginator, страницы которого знают своё окно навигации.
+    count_posts(object_list) заменяет COUNT(*) для num_pages,
+    см. posts.counts.
+    """
+
+    def __init__(self, *args, count_posts=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_posts = count_posts
+
+    @cached_property
+    def count(self):
+        if self.count_posts is None:
+            return super().count
+        return self.count_posts(self.object_list)
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+class CursorPage(Page):
+    """Страница ленты, выбранная по курсору, без COUNT(*) и OFFSET."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<CursorPage>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return encode_cursor(self.object_list[-1], CURSOR_NEXT)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return encode_cursor(self.object_list[0], CURSOR_PREVIOUS)
+
+
+class CursorPaginator(Paginator):
+    """Keyset-пагинация по (pub_date, id): стоимость страницы не зависит
+    от её глубины. Атрибуты обычного Paginator (count, num_pages)
+    остаются доступны, но вычисляются только при обращении к ним.
+    """
+
+    ordering = ('-pub_date', '-id')
+
+    def get_cursor_page(self, cursor):
+        position = decode_cursor(cursor)
+        if position is None:
+            return self._page_after(None)
+        direction, pub_date, pk = position
+        if direction == CURSOR_PREVIOUS:
+            return self._page_before(pub_date, pk)
+        return self._page_after((pub_date, pk))
+
+    def _page_after(self, key):
+        posts = self.object_list.order_by(*self.ordering)
+        if key is not None:
+            pub_date, pk = key
+            posts = posts.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )
+        posts = list(posts[:self.per_page + 1])
+        return CursorPage(
+            posts[:self.per_page],
+            self,
+            has_next=len(posts) > self.per_page,
+            has_previous=key is not None,
+        )
+
+    def _page_before(self, pub_date, pk):
+        posts = list(
+            self.object_list
+            .order_by('pub_date', 'id')
+            .filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+            )[:self.per_page + 1]
+        )
+        has_previous = len(posts) > self.per_page
+        if not has_previous:
+            # Дошли до начала ленты: отдаём полную первую страницу.
+            return self._page_after(None)
+        posts = posts[:self.per_page]
+        posts.reverse()
+        return CursorPage(
+            posts,
+            self,
+            has_next=True,
+            has_previous=has_previous,
+        )
+
+
+def pagination(request, posts, count='exact', scopes=()):
+    """Страница ленты: по курсору или, с параметром page, по номеру.
+    count — стратегия подсчёта из posts.counts.COUNT_STRATEGIES,
+    scopes — области кеша ленты для стратегии cached.
+    """
+    if 'page' in request.GET:
+        count_posts = COUNT_STRATEGIES[count]
+        paginator = WindowedPaginator(
+            posts, settings.MAX_POSTS,
+            count_posts=lambda posts: count_posts(posts, scopes),
+        )
+        return paginator.get_page(request.GET.get('page'))
+    paginator = CursorPaginator(posts, settings.MAX_POSTS)
+    return paginator.get_cursor_page(request.GET.get('cursor'))
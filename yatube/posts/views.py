@@ -1,72 +1,179 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.utils.http import urlencode
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import condition
 
-from .utils import pagination
-from .models import Post, Group, User
-from .forms import PostForm
+from core.query_budget import query_budget
+from core.replicas import read_replica
+from .cache import (
+    FEED_SCOPE, author_scope, feed_page, group_scope, post_etag,
+    post_last_modified
+)
+from .export import CONTENT_TYPES, EXPORT_FORMATS, export_lines
+from .lookups import group_by_slug, user_by_username
+from .search import search_posts
+from .utils import WindowedPaginator, pagination
+from .models import Post, PostCounter
+from .forms import PostForm, PostImageForm
 
 
+@query_budget(5)
+@read_replica
+@feed_page(lambda: [FEED_SCOPE])
 def index(request):
     template = 'posts/index.html'
-    posts = Post.objects.all()
+    posts = Post.objects.feed()
     context = {
-        'page_obj': pagination(request, posts),
+        'page_obj': pagination(
+            request, posts,
+            count=settings.POSTS_INDEX_COUNT_STRATEGY, scopes=[FEED_SCOPE],
+        ),
     }
     return render(request, template, context)
 
 
+@query_budget(6)
+@read_replica
+@feed_page(lambda slug: [group_scope(slug)])
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = group_by_slug.get_or_404(slug, local=False)
     template = 'posts/group_list.html'
-    posts = group.posts.all()
+    posts = group.posts.feed()
     context = {
         'group': group,
-        'page_obj': pagination(request, posts),
+        'page_obj': pagination(
+            request, posts, count='cached', scopes=[group_scope(slug)]
+        ),
     }
     return render(request, template, context)
 
 
+@query_budget(6)
+@read_replica
+@feed_page(lambda username: [author_scope(username)])
 def profile(request, username):
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
+    author = user_by_username.get_or_404(username, local=False)
+    posts = author.posts.feed()
     context = {
         'author': author,
-        'page_obj': pagination(request, posts),
+        # Счётчик автора, а не COUNT(*) по его постам.
+        'posts_count': PostCounter.objects.filter(
+            author_id=author.pk
+        ).values_list('posts_count', flat=True).first() or 0,
+        'page_obj': pagination(
+            request, posts,
+            count='cached', scopes=[author_scope(author.username)],
+        ),
     }
     return render(request, template, context)
 
 
+# read_replica снаружи condition: и запрос метаданных для 304
+# идёт на реплику.
+@query_budget(4)
+@read_replica
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.feed().select_related('author__post_counter'),
+        id=post_id
+    )
     context = {
         'post': post,
     }
     return render(request, template, context)
 
 
+# Обычно 5 запросов; первый пост автора ещё вставляет строку
+# его счётчика (BEGIN, INSERT, UPDATE).
+@query_budget(8)
 @login_required
 def post_create(request):
     template = 'posts/create_post.html'
-    form = PostForm(request.POST or None)
-    if form.is_valid():
-        form = form.save(commit=False)
-        form.author = request.user
-        form.save()
+    post = Post(author=request.user)
+    form = PostForm(request.POST or None, instance=post)
+    image_form = PostImageForm(
+        request.POST or None, files=request.FILES or None, instance=post
+    )
+    if form.is_valid() and image_form.is_valid():
+        post.save()
         return redirect('posts:profile', request.user)
-    return render(request, template, {'form': form})
+    return render(
+        request, template, {'form': form, 'image_form': image_form}
+    )
 
 
+@query_budget(6)
 @login_required
 def post_edit(request, post_id):
     template = 'posts/create_post.html'
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.feed(), id=post_id)
     form = PostForm(request.POST or None, instance=post)
+    image_form = PostImageForm(
+        request.POST or None, files=request.FILES or None, instance=post
+    )
     if post.author != request.user:
         return redirect('posts:post_detail', post_id)
-    if form.is_valid():
-        form = form.save(commit=False)
-        form.save()
+    if form.is_valid() and image_form.is_valid():
+        post.save()
         return redirect('posts:post_detail', post_id)
-    return render(request, template, {'form': form, 'is_edit': True})
+    return render(
+        request, template,
+        {'form': form, 'image_form': image_form, 'is_edit': True},
+    )
+
+
+@query_budget(4)
+@read_replica
+def search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    posts = search_posts(Post.objects.feed(), query)
+    paginator = WindowedPaginator(posts, settings.MAX_POSTS)
+    context = {
+        'query': query,
+        'page_query': urlencode({'q': query}) + '&',
+        'page_obj': paginator.get_page(request.GET.get('page')),
+    }
+    return render(request, template, context)
+
+
+def export_response(posts, file_format, filename, limit=None):
+    if file_format not in EXPORT_FORMATS:
+        raise Http404
+    response = StreamingHttpResponse(
+        export_lines(posts, file_format, limit=limit),
+        content_type=CONTENT_TYPES[file_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{file_format}"'
+    )
+    return response
+
+
+@login_required
+def profile_export(request, username, file_format):
+    author = user_by_username.get_or_404(username)
+    return export_response(
+        author.posts.all(), file_format, f'posts-{author.username}',
+        limit=settings.POSTS_EXPORT_MAX_ROWS,
+    )
+
+
+@login_required
+def group_export(request, slug, file_format):
+    group = group_by_slug.get_or_404(slug)
+    return export_response(
+        group.posts.all(), file_format, f'posts-{slug}',
+        limit=settings.POSTS_EXPORT_MAX_ROWS,
+    )
+
+
+@staff_member_required
+def posts_export(request, file_format):
+    return export_response(Post.objects.all(), file_format, 'posts')
@@ -34,14 +34,18 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestTimingMiddleware',
+    'core.replicas.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.fragments.FragmentMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -52,7 +56,8 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -76,7 +81,40 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        # Соединение живёт между запросами, а не открывается заново.
+        'CONN_MAX_AGE': 60,
+    },
+    # Копия основной базы для чтения лент, обновляется sync_replica.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+# Реплики, с которых читают ленты и страницы постов (core.replicas);
+# пустой список — всё читается с основной базы. Например ['replica'].
+DATABASE_REPLICAS = []
+# Насколько реплика может отставать, секунд: столько после записи
+# автор читает с основной базы, и столько живёт в кеше страница,
+# отрисованная по реплике.
+REPLICA_MAX_LAG = 5
+REPLICA_STICKY_COOKIE = 'primary'
+
+# Прагмы для каждого нового соединения SQLite (core.db):
+# WAL — читатели не блокируют писателя и наоборот; NORMAL в WAL
+# безопасен при сбое процесса; busy_timeout — ждать блокировку (мс),
+# а не падать с "database is locked"; cache_size в КБ со знаком минус.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
 }
 
 
@@ -116,12 +154,158 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# collectstatic добавляет хеш содержимого в имена файлов и пишет рядом
+# сжатые копии .gz и .br (core.storage).
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Отдавать STATIC_ROOT самим приложением (core.views.serve_static)
+# со сжатыми копиями и вечным кешем; False, если это делает веб-сервер.
+SERVE_STATIC = True
+
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма из запросов только попадают в очередь (core.mail), доставляет
+# их через EMAIL_QUEUE_BACKEND команда send_queued_mail.
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_QUEUE_BATCH_SIZE = 50
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+# Пауза перед повтором: RETRY_DELAY, затем вдвое больше каждый раз,
+# но не дольше MAX_DELAY секунд.
+EMAIL_QUEUE_RETRY_DELAY = 60
+EMAIL_QUEUE_MAX_DELAY = 60 * 60
+# На столько секунд письмо закрепляется за обработчиком.
+EMAIL_QUEUE_LEASE = 60 * 5
+# Столько дней send_queued_mail хранит законченные письма.
+EMAIL_QUEUE_KEEP_DAYS = 7
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 MAX_POSTS = 10
+
+# Превышение бюджета SQL-запросов view (core.query_budget):
+# False — предупреждение в лог, True — исключение. Тесты включают его
+# сами: manage.py test через TEST_RUNNER, pytest через conftest.py.
+QUERY_BUDGET_STRICT = False
+TEST_RUNNER = 'core.test_runner.StrictQueryBudgetRunner'
+
+# Поколения лент, страницы, карточки, счётчики, поиск по slug, ключи
+# миниатюр, сессии и их пользователи общие для всех процессов сервера:
+# в бою это memcached по адресу MEMCACHED_LOCATION. Кеш в памяти процесса
+# годится только для разработки и тестов, manage.py check --deploy его
+# не пропустит (core.checks).
+MEMCACHED_LOCATION = os.environ.get('MEMCACHED_LOCATION')
+
+
+def shared_cache(name):
+    if MEMCACHED_LOCATION:
+        return {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': MEMCACHED_LOCATION,
+            'KEY_PREFIX': name,
+        }
+    return {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': name,
+    }
+
+
+CACHES = {
+    'default': shared_cache('default'),
+    'thumbnails': shared_cache('thumbnails'),
+    'sessions': shared_cache('sessions'),
+}
+
+# Сессии пишутся и в базу, и в кеш, читаются из кеша. Там же
+# CachedModelBackend держит пользователя сессии (core.auth), так что
+# авторизованный запрос обходится без запросов к базе.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+# ModelBackend остаётся в списке: сессии, открытые до появления
+# CachedModelBackend, ссылаются на него и должны пускать дальше.
+AUTHENTICATION_BACKENDS = [
+    'core.auth.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+AUTH_USER_CACHE_TIMEOUT = 60 * 15
+
+# Миниатюры картинок постов (posts.thumbnails): создаются пулом из
+# POSTS_THUMBNAIL_WORKERS потоков после загрузки (0 — сразу в запросе,
+# вне бюджета view), ленты берут готовые. Очередь пула не переживает
+# перезапуск: недостающие миниатюры создаёт manage.py generate_thumbnails.
+# Ключи sorl читаются из кеша, база — запасной слой.
+POSTS_THUMBNAIL_SIZES = {
+    'list': '960x339',
+    'detail': '960x540',
+}
+POSTS_THUMBNAIL_WORKERS = 2
+THUMBNAIL_KVSTORE = 'sorl.thumbnail.kvstores.cached_db_kvstore.KVStore'
+THUMBNAIL_CACHE = 'thumbnails'
+
+# Кеш лент сбрасывается сменой поколения (posts.cache), таймаут лишь
+# ограничивает срок жизни записей. Шапку с пользователем в закешированную
+# страницу подставляет core.fragments.FragmentMiddleware.
+POSTS_PAGE_CACHE = True
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+# Карточки постов лент (posts.cards). Ключ меняется вместе с постом,
+# автором или группой, так что таймаут лишь чистит старые версии.
+POSTS_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Группы по slug и пользователи по username (posts.lookups): LRU на
+# LOOKUP_CACHE_SIZE записей в процессе поверх общего кеша. Правки в других
+# процессах видны в LRU не позже чем через LOOKUP_LOCAL_TIMEOUT секунд;
+# кешируемые страницы групп и профилей LRU не используют.
+LOOKUP_CACHE_SIZE = 1024
+LOOKUP_LOCAL_TIMEOUT = 30
+LOOKUP_CACHE_TIMEOUT = 60 * 60
+# Отсутствующее имя в общем кеше помнится недолго: перебор адресов
+# не должен заполнять его надолго.
+LOOKUP_MISS_TIMEOUT = 60
+
+# Подсчёт постов для постраничной навигации (posts.counts).
+# Главная: 'exact' — COUNT(*) на каждый запрос, 'cached' — COUNT(*)
+# до следующей записи в ленту, 'estimated' — по статистике таблицы.
+POSTS_INDEX_COUNT_STRATEGY = 'cached'
+POSTS_COUNT_CACHE_TIMEOUT = 60 * 10
+
+# Сколько постов выгрузка (posts.export) читает из базы за один запрос.
+POSTS_EXPORT_CHUNK_SIZE = 2000
+# Выгрузка автора или группы доступна только вошедшим и отдаёт не
+# больше стольких постов; полная выгрузка сайта — для персонала.
+POSTS_EXPORT_MAX_ROWS = 10000
+
+# Замеры запросов (core.middleware): заголовок Server-Timing (всем при
+# SERVER_TIMING_HEADER, иначе только персоналу) и выборка запросов
+# дольше SLOW_REQUEST_MS в лог core.timing.slow.
+SERVER_TIMING_HEADER = DEBUG
+SLOW_REQUEST_MS = 500
+SLOW_REQUEST_SAMPLE_RATE = 1.0
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        # INFO — строка JSON на каждый запрос.
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}